@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Commande --all : génération de tous les rapports
+"""
+
+from greenmove_reporting import rendre_en_parallele
+
+
+def run(args, analytics, stats, log=print):
+    """Génère le rapport global, l'analyse, l'analyse textuelle et le top 5 utilisateurs"""
+    log("Génération de tous les rapports...")
+    
+    formats_list = ['pdf', 'html'] if args.format == 'both' else [args.format]
+    
+    # Rapports indépendants : (libellé, méthode, arguments)
+    taches = []
+    for fmt in formats_list:
+        ext = 'html' if fmt == 'html' else 'pdf'
+        taches.append((f"Rapport global {fmt.upper()}", analytics.generer_rapport_pdf,
+                       (f'rapport_greenmove_global.{ext}', fmt)))
+    for fmt in formats_list:
+        ext = 'html' if fmt == 'html' else 'pdf'
+        taches.append((f"Analyse {fmt.upper()} avec illustrations", analytics.generer_analyse_pdf,
+                       (f'analyse_greenmove.{ext}', fmt)))
+    taches.append(("Analyse textuelle", analytics.generer_analyse_textuelle, ()))
+    
+    # Chaque rapport est rendu dans son propre processus (état matplotlib séparé)
+    for libelle in rendre_en_parallele(taches):
+        log(f"  • {libelle} ✓")
+    
+    # Rapports utilisateurs (top 5) : processus bornés par le nombre de cœurs,
+    # chacun ne recevant que les trajets de son utilisateur
+    log("  • Rapports utilisateurs (top 5)...")
+    top_users = analytics.top_utilisateurs(5)
+    for i, user in enumerate(analytics.generer_rapports_utilisateurs(top_users), 1):
+        log(f"    [{i}/5] {user} ✓")
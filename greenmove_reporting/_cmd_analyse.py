@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+Commande --analyse : analyse PDF/HTML avec illustrations
+"""
+
+from greenmove_reporting import rendre_en_parallele
+
+
+def run(args, analytics, stats, log=print):
+    """Génère l'analyse avec illustrations et recommandations"""
+    formats_list = ['pdf', 'html'] if args.format == 'both' else [args.format]
+    taches = []
+    for fmt in formats_list:
+        ext = 'html' if fmt == 'html' else 'pdf'
+        output = args.output or f'analyse_greenmove.{ext}'
+        log(f"Génération de l'analyse avec illustrations ({fmt.upper()}): {output}")
+        taches.append((output, analytics.generer_analyse_pdf, (output, fmt)))
+    # PDF et HTML rendus en parallèle avec --format both
+    for output in rendre_en_parallele(taches):
+        log(f"✓ Analyse générée: {output}")
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+Commande --global : rapport global PDF et/ou HTML
+"""
+
+from greenmove_reporting import rendre_en_parallele
+
+
+def run(args, analytics, stats, log=print):
+    """Génère uniquement le rapport global"""
+    formats_list = ['pdf', 'html'] if args.format == 'both' else [args.format]
+    taches = []
+    for fmt in formats_list:
+        ext = 'html' if fmt == 'html' else 'pdf'
+        output = args.output or f'rapport_greenmove_global.{ext}'
+        log(f"Génération du rapport global ({fmt.upper()}): {output}")
+        taches.append((output, analytics.generer_rapport_pdf, (output, fmt)))
+    # PDF et HTML rendus en parallèle avec --format both
+    for output in rendre_en_parallele(taches):
+        log(f"✓ Rapport généré: {output}")
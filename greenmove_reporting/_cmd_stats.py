@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Commande --stats : affichage des statistiques sans générer de fichier
+"""
+
+
+def run(args, analytics, stats, log=print):
+    """Affiche les statistiques globales et par mode de transport"""
+    print("\n" + "="*80)
+    print("STATISTIQUES GREENMOVE")
+    print("="*80)
+    
+    print(f"\n📊 Vue d'ensemble")
+    print(f"   Période : du {stats['periode_debut'].strftime('%d/%m/%Y')} au {stats['periode_fin'].strftime('%d/%m/%Y')}")
+    print(f"   Utilisateurs : {stats['nombre_utilisateurs']:,}")
+    print(f"   Trajets : {stats['nombre_trajets']:,}")
+    
+    print(f"\n🛣️  Distances")
+    print(f"   Total : {stats['distance_totale']:,.1f} km")
+    print(f"   Moyenne : {stats['distance_moyenne']:.2f} km/trajet")
+    
+    print(f"\n⏱️  Durées")
+    print(f"   Total : {stats['duree_totale']:,.0f} min ({stats['duree_totale']/60:.1f} h)")
+    print(f"   Moyenne : {stats['duree_moyenne']:.1f} min/trajet")
+    
+    print(f"\n🌍 Émissions CO₂")
+    print(f"   Total : {stats['emission_totale']/1000:.1f} kg")
+    print(f"   Moyenne : {stats['emission_moyenne']:.1f} g/trajet")
+    
+    print("\n📈 Par mode de transport :")
+    mode_stats = analytics.stats_par_mode[[('utilisateur', 'count'),
+                                           ('distance', 'sum'),
+                                           ('emission_co2', 'sum')]].droplevel(1, axis=1)
+    mode_stats = mode_stats.sort_values('utilisateur', ascending=False)
+    mode_stats['pct'] = mode_stats['utilisateur'] / stats['nombre_trajets'] * 100
+    
+    for mode, nb, dist, co2, pct in mode_stats.itertuples(name=None):
+        print(f"   {mode:15s} : {nb:6.0f} trajets ({pct:5.1f}%) - {dist:8.1f} km - {co2/1000:6.1f} kg CO₂")
+    
+    print("="*80)
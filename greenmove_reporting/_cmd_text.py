@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+Commande --text : analyse textuelle uniquement
+"""
+
+
+def run(args, analytics, stats, log=print):
+    """Génère uniquement l'analyse textuelle"""
+    output = args.output or 'analyse_greenmove.txt'
+    log(f"Génération de l'analyse textuelle: {output}")
+    analytics.generer_analyse_textuelle(output)
+    log(f"✓ Analyse générée: {output}")
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+Commande --user-id : rapport pour un utilisateur spécifique
+"""
+
+
+def run(args, analytics, stats, log=print):
+    """Génère le rapport d'un utilisateur donné"""
+    output = args.output or f'rapport_utilisateur_{args.user_id}.pdf'
+    log(f"Génération du rapport utilisateur: {output}")
+    analytics.generer_rapport_utilisateur(args.user_id, output)
+    log(f"✓ Rapport utilisateur généré: {output}")
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+Commande --users N : rapports des N utilisateurs les plus actifs
+"""
+
+
+def run(args, analytics, stats, log=print):
+    """Génère les rapports des N utilisateurs les plus actifs"""
+    log(f"Génération de {args.users} rapports utilisateurs...")
+    top_users = analytics.top_utilisateurs(args.users)
+    # Rapports générés en parallèle, un processus par utilisateur
+    for i, user in enumerate(analytics.generer_rapports_utilisateurs(top_users), 1):
+        log(f"  [{i}/{args.users}] {user} ✓")
+    log(f"✓ {args.users} rapports générés")
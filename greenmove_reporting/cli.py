@@ -5,10 +5,78 @@ Interface en ligne de commande pour Greenmove Analytics
 """
 
 import argparse
+import importlib
+import os
 import sys
-from greenmove_reporting import GreenmoveAnalytics
 
-def main():
+# Fichier de configuration TOML par défaut (surchargé par GREENMOVE_CONFIG)
+CONFIG_TOML_DEFAUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.toml')
+
+# Correspondance option → module de commande (chargé à la demande)
+COMMANDES = (
+    ('stats', '_cmd_stats'),
+    ('global_report', '_cmd_global'),
+    ('text', '_cmd_text'),
+    ('analyse', '_cmd_analyse'),
+    ('user_id', '_cmd_utilisateur'),
+    ('users', '_cmd_utilisateurs'),
+    ('all', '_cmd_all'),
+)
+
+def _lire_config_toml():
+    """Lit la section [database] du fichier TOML de configuration, s'il existe
+    
+    Le chemin est donné par la variable GREENMOVE_CONFIG (défaut : config.toml
+    à côté de ce script). Renvoie None si le fichier est absent.
+    """
+    chemin = os.environ.get('GREENMOVE_CONFIG', CONFIG_TOML_DEFAUT)
+    if not os.path.exists(chemin):
+        return None
+    try:
+        import tomllib
+    except ModuleNotFoundError:
+        # Python < 3.11 : même API fournie par le paquet tomli
+        import tomli as tomllib
+    with open(chemin, 'rb') as f:
+        config = tomllib.load(f)
+    if 'database' not in config:
+        print(f"❌ Erreur: section [database] absente du fichier de configuration {chemin}")
+        sys.exit(1)
+    return config['database']
+
+def _charger_config(args):
+    """Construit les paramètres de connexion depuis config.toml, config.py ou la ligne de commande"""
+    db_config = _lire_config_toml()
+    if db_config is None:
+        try:
+            from config import DB_CONFIG as db_config
+        except ImportError:
+            db_config = None
+    
+    if db_config is None:
+        if not all([args.host, args.db, args.user]):
+            print("❌ Erreur: Créez un fichier config.toml (ou config.py) ou spécifiez --host, --db et --user")
+            sys.exit(1)
+        return {
+            'host': args.host,
+            'database': args.db,
+            'user': args.user,
+            'password': args.password or input("Mot de passe: "),
+            'port': args.port
+        }
+    
+    if not args.host:
+        return db_config
+    return {
+        'host': args.host,
+        'database': args.db,
+        'user': args.user,
+        'password': args.password,
+        'port': args.port
+    }
+
+def _construire_parser():
+    """Construit le parseur des arguments de la ligne de commande"""
     parser = argparse.ArgumentParser(
         description='Greenmove - Génération de rapports d\'analyse',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -52,7 +120,7 @@ Exemples d'utilisation:
     parser.add_argument('--user', 
                        help='Nom d\'utilisateur PostgreSQL')
     parser.add_argument('--password', 
-                       help='Mot de passe (non recommandé, utilisez plutôt config.py)')
+                       help='Mot de passe (non recommandé, utilisez plutôt config.toml)')
     parser.add_argument('--port', type=int, default=5432,
                        help='Port PostgreSQL (défaut: 5432)')
     
@@ -80,196 +148,63 @@ Exemples d'utilisation:
                        help='Format de sortie : pdf, html, ou both (défaut: pdf)')
     parser.add_argument('--quiet', '-q', action='store_true',
                        help='Mode silencieux')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                       help='Relire les trajets depuis la base sans utiliser le cache local')
     
+    return parser
+
+def main():
+    parser = _construire_parser()
     args = parser.parse_args()
+    # Messages de progression : fonction muette en mode silencieux
+    log = (lambda *a, **k: None) if args.quiet else print
     
     # Charger la configuration
-    try:
-        from config import DB_CONFIG
-        if not args.host:
-            config = DB_CONFIG
-        else:
-            config = {
-                'host': args.host,
-                'database': args.db,
-                'user': args.user,
-                'password': args.password,
-                'port': args.port
-            }
-    except ImportError:
-        if not all([args.host, args.db, args.user]):
-            print("❌ Erreur: Créez un fichier config.py ou spécifiez --host, --db et --user")
-            sys.exit(1)
-        config = {
-            'host': args.host,
-            'database': args.db,
-            'user': args.user,
-            'password': args.password or input("Mot de passe: "),
-            'port': args.port
-        }
+    config = _charger_config(args)
     
-    if not args.quiet:
-        print("="*60)
-        print("GREENMOVE - GÉNÉRATION DE RAPPORTS")
-        print("="*60)
-        print(f"\nConnexion à {config['host']}...")
+    log("="*60)
+    log("GREENMOVE - GÉNÉRATION DE RAPPORTS")
+    log("="*60)
+    log(f"\nConnexion à {config['host']}...")
+    
+    # Import différé : pandas/matplotlib ne sont chargés qu'une fois
+    # les arguments et la configuration validés (--help reste instantané)
+    from greenmove_reporting import GreenmoveAnalytics
     
     # Créer l'instance et charger les données
     analytics = GreenmoveAnalytics(**config)
     
-    if not analytics.connect_and_load_data():
+    if args.stats or args.text:
+        # --stats et --text n'utilisent que des agrégats : calculés par PostgreSQL,
+        # sans lire les trajets
+        charge = analytics.charger_statistiques_sql()
+    elif args.users:
+        # --users N : classement fait par PostgreSQL, seuls les trajets des N utilisateurs sont lus
+        top_users = analytics.top_utilisateurs_sql(args.users)
+        charge = top_users is not None and analytics.connect_and_load_data(user_id=top_users,
+                                                                          cache=args.cache)
+    else:
+        # Pour un seul utilisateur, seuls ses trajets sont lus depuis la base
+        charge = analytics.connect_and_load_data(user_id=args.user_id, cache=args.cache)
+    if not charge:
         print("❌ Erreur de connexion à la base de données")
         sys.exit(1)
     
-    if not args.quiet:
-        print(f"✓ {len(analytics.df)} trajets chargés")
-        print("Calcul des statistiques...")
+    if analytics.df is not None:
+        log(f"✓ {len(analytics.df)} trajets chargés")
+        log("Calcul des statistiques...")
     
     stats = analytics.calculer_statistiques_globales()
     
-    # Exécuter l'action demandée
-    if args.stats:
-        # Afficher les statistiques uniquement
-        print("\n" + "="*80)
-        print("STATISTIQUES GREENMOVE")
-        print("="*80)
-        
-        print(f"\n📊 Vue d'ensemble")
-        print(f"   Période : du {stats['periode_debut'].strftime('%d/%m/%Y')} au {stats['periode_fin'].strftime('%d/%m/%Y')}")
-        print(f"   Utilisateurs : {stats['nombre_utilisateurs']:,}")
-        print(f"   Trajets : {stats['nombre_trajets']:,}")
-        
-        print(f"\n🛣️  Distances")
-        print(f"   Total : {stats['distance_totale']:,.1f} km")
-        print(f"   Moyenne : {stats['distance_moyenne']:.2f} km/trajet")
-        
-        print(f"\n⏱️  Durées")
-        print(f"   Total : {stats['duree_totale']:,.0f} min ({stats['duree_totale']/60:.1f} h)")
-        print(f"   Moyenne : {stats['duree_moyenne']:.1f} min/trajet")
-        
-        print(f"\n🌍 Émissions CO₂")
-        print(f"   Total : {stats['emission_totale']/1000:.1f} kg")
-        print(f"   Moyenne : {stats['emission_moyenne']:.1f} g/trajet")
-        
-        print("\n📈 Par mode de transport :")
-        mode_stats = analytics.df.groupby('mode_transport').agg({
-            'utilisateur': 'count',
-            'distance': 'sum',
-            'emission_co2': 'sum'
-        }).sort_values('utilisateur', ascending=False)
-        
-        for mode in mode_stats.index:
-            nb = mode_stats.loc[mode, 'utilisateur']
-            dist = mode_stats.loc[mode, 'distance']
-            co2 = mode_stats.loc[mode, 'emission_co2']
-            pct = (nb / stats['nombre_trajets']) * 100
-            print(f"   {mode:15s} : {nb:6.0f} trajets ({pct:5.1f}%) - {dist:8.1f} km - {co2/1000:6.1f} kg CO₂")
-        
-        print("="*80)
-        
-    elif args.global_report:
-        # Rapport global uniquement
-        formats_list = ['pdf', 'html'] if args.format == 'both' else [args.format]
-        for fmt in formats_list:
-            ext = 'html' if fmt == 'html' else 'pdf'
-            output = args.output or f'rapport_greenmove_global.{ext}'
-            if not args.quiet:
-                print(f"Génération du rapport global ({fmt.upper()}): {output}")
-            analytics.generer_rapport_pdf(output, format=fmt)
-            if not args.quiet:
-                print(f"✓ Rapport généré: {output}")
-    
-    elif args.text:
-        # Analyse textuelle uniquement
-        output = args.output or 'analyse_greenmove.txt'
-        if not args.quiet:
-            print(f"Génération de l'analyse textuelle: {output}")
-        analytics.generer_analyse_textuelle(output)
-        if not args.quiet:
-            print(f"✓ Analyse générée: {output}")
-    
-    elif args.analyse:
-        # Analyse PDF/HTML avec illustrations
-        formats_list = ['pdf', 'html'] if args.format == 'both' else [args.format]
-        for fmt in formats_list:
-            ext = 'html' if fmt == 'html' else 'pdf'
-            output = args.output or f'analyse_greenmove.{ext}'
-            if not args.quiet:
-                print(f"Génération de l'analyse avec illustrations ({fmt.upper()}): {output}")
-            analytics.generer_analyse_pdf(output, format=fmt)
-            if not args.quiet:
-                print(f"✓ Analyse générée: {output}")
-    
-    elif args.user_id:
-        # Rapport pour un utilisateur spécifique
-        output = args.output or f'rapport_utilisateur_{args.user_id}.pdf'
-        if not args.quiet:
-            print(f"Génération du rapport utilisateur: {output}")
-        analytics.generer_rapport_utilisateur(args.user_id, output)
-        if not args.quiet:
-            print(f"✓ Rapport utilisateur généré: {output}")
-    
-    elif args.users:
-        # Rapports pour les N utilisateurs les plus actifs
-        if not args.quiet:
-            print(f"Génération de {args.users} rapports utilisateurs...")
-        top_users = analytics.df['utilisateur'].value_counts().head(args.users).index
-        for i, user in enumerate(top_users, 1):
-            if not args.quiet:
-                print(f"  [{i}/{args.users}] {user}...", end=' ')
-            analytics.generer_rapport_utilisateur(user)
-            if not args.quiet:
-                print("✓")
-        if not args.quiet:
-            print(f"✓ {args.users} rapports générés")
-    
-    elif args.all:
-        # Tous les rapports
-        if not args.quiet:
-            print("Génération de tous les rapports...")
-        
-        formats_list = ['pdf', 'html'] if args.format == 'both' else [args.format]
-        
-        # Rapport global
-        for fmt in formats_list:
-            ext = 'html' if fmt == 'html' else 'pdf'
-            if not args.quiet:
-                print(f"  • Rapport global {fmt.upper()}...", end=' ')
-            analytics.generer_rapport_pdf(f'rapport_greenmove_global.{ext}', format=fmt)
-            if not args.quiet:
-                print("✓")
-        
-        # Analyse avec illustrations
-        for fmt in formats_list:
-            ext = 'html' if fmt == 'html' else 'pdf'
-            if not args.quiet:
-                print(f"  • Analyse {fmt.upper()} avec illustrations...", end=' ')
-            analytics.generer_analyse_pdf(f'analyse_greenmove.{ext}', format=fmt)
-            if not args.quiet:
-                print("✓")
-        
-        # Analyse textuelle
-        if not args.quiet:
-            print("  • Analyse textuelle...", end=' ')
-        analytics.generer_analyse_textuelle()
-        if not args.quiet:
-            print("✓")
-        
-        # Rapports utilisateurs (top 5)
-        if not args.quiet:
-            print("  • Rapports utilisateurs (top 5)...")
-        top_users = analytics.df['utilisateur'].value_counts().head(5).index
-        for i, user in enumerate(top_users, 1):
-            if not args.quiet:
-                print(f"    [{i}/5] {user}...", end=' ')
-            analytics.generer_rapport_utilisateur(user)
-            if not args.quiet:
-                print("✓")
+    # Exécuter l'action demandée : seul le module de la commande choisie est importé
+    commande = next((cmd for dest, cmd in COMMANDES if getattr(args, dest)), None)
+    if commande:
+        importlib.import_module(commande).run(args, analytics, stats, log)
+    analytics.fermer_connexion()
     
-    if not args.quiet:
-        print("\n" + "="*60)
-        print("✅ TERMINÉ")
-        print("="*60)
+    log("\n" + "="*60)
+    log("✅ TERMINÉ")
+    log("="*60)
 
 if __name__ == "__main__":
     try:
@@ -74,11 +74,13 @@ def exemple_utilisateur_specifique():
     analytics = GreenmoveAnalytics(**config)
     
     if analytics.connect_and_load_data():
-        # Afficher les premiers utilisateurs
-        print("\nUtilisateurs disponibles (10 premiers) :")
-        for i, user in enumerate(analytics.df['utilisateur'].unique()[:10], 1):
-            nb_trajets = len(analytics.df[analytics.df['utilisateur'] == user])
-            print(f"{i}. {user} ({nb_trajets} trajets)")
+        # Afficher les utilisateurs les plus actifs (agrégats par utilisateur
+        # calculés une fois par top_utilisateurs, sans nouveau regroupement)
+        print("\nUtilisateurs disponibles (10 plus actifs) :")
+        top_users = analytics.top_utilisateurs(10)
+        trajets = analytics.agregats_utilisateurs['trajets']
+        for i, user in enumerate(top_users, 1):
+            print(f"{i}. {user} ({trajets[user]} trajets)")
         
         # Demander l'utilisateur
         user_id = input("\nEntrez l'ID utilisateur : ")
@@ -128,17 +130,14 @@ def exemple_statistiques_rapides():
         print(f"   Moyenne : {stats['emission_moyenne']:.1f} g/trajet")
         
         print("\n📈 Par mode de transport :")
-        mode_stats = analytics.df.groupby('mode_transport').agg({
-            'utilisateur': 'count',
-            'distance': 'sum',
-            'emission_co2': 'sum'
-        }).sort_values('utilisateur', ascending=False)
+        # Agrégats par mode déjà calculés (codes catégoriels) par calculer_statistiques_globales
+        mode_stats = analytics.stats_par_mode[[('utilisateur', 'count'),
+                                               ('distance', 'sum'),
+                                               ('emission_co2', 'sum')]].droplevel(1, axis=1)
+        mode_stats = mode_stats.sort_values('utilisateur', ascending=False)
+        mode_stats['pct'] = mode_stats['utilisateur'] / stats['nombre_trajets'] * 100
         
-        for mode in mode_stats.index:
-            nb = mode_stats.loc[mode, 'utilisateur']
-            dist = mode_stats.loc[mode, 'distance']
-            co2 = mode_stats.loc[mode, 'emission_co2']
-            pct = (nb / stats['nombre_trajets']) * 100
+        for mode, nb, dist, co2, pct in mode_stats.itertuples(name=None):
             print(f"   {mode:15s} : {nb:6.0f} trajets ({pct:5.1f}%) - {dist:8.1f} km - {co2/1000:6.1f} kg CO₂")
         
         print("="*80)
@@ -5,13 +5,28 @@ Greenmove - Rapport d'Analyse des Déplacements
 Génère un rapport complet avec graphiques et statistiques
 """
 
-import psycopg2
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from pandas.api.types import union_categoricals
+import matplotlib
+# Rendu sans interface graphique, y compris dans les processus de rendu
+matplotlib.use('Agg')
+# pyplot n'est pas importé, ni directement ni par les tracés pandas (Series.plot,
+# DataFrame.boxplot) : les figures sont créées directement (Figure)
+# et le rendu seul n'a besoin ni de son état global ni de ses backends
+import matplotlib.style
+from matplotlib import colormaps
+from matplotlib.artist import setp
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
+from cycler import cycler
 from datetime import datetime
+from io import StringIO
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import hashlib
+import tempfile
+import os
 import numpy as np
-from matplotlib.backends.backend_pdf import PdfPages
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -30,19 +45,427 @@ except ImportError:
     SEUIL_BON = 50
     SEUIL_MOYEN = 100
 
+# Chargement des trajets
+TAILLE_BLOC_SQL = 50_000
+TAILLE_TAMPON_COPY = 64 * 1024 * 1024  # octets d'export CSV gardés en mémoire
+COLONNES_TRAJETS = ['utilisateur', 'start_time', 'mode_transport',
+                    'distance', 'duration_in_minutes', 'emission_co2']
+COLONNES_NUMERIQUES = ['distance', 'duration_in_minutes', 'emission_co2']
+COLONNES_CATEGORIELLES = ['mode_transport', 'utilisateur']
+# Colonnes dont l'expression SQL diffère du nom dans le DataFrame
+# (départs exportés dans un format fixe, relu sans inférence par FORMAT_DATE_SQL ;
+# métriques converties en real côté serveur : le CSV ne porte que les chiffres
+# utiles au float32 du DataFrame, pour la même valeur une fois relue)
+EXPRESSIONS_SQL = {'start_time': '''to_char("startTime", 'YYYY-MM-DD HH24:MI:SS.US') as start_time'''}
+EXPRESSIONS_SQL.update({col: f'{col}::real as {col}' for col in COLONNES_NUMERIQUES})
+FORMAT_DATE_SQL = '%Y-%m-%d %H:%M:%S.%f'
+# Empreinte d'un trajet pour la sonde du cache : seules les colonnes source
+# de COLONNES_TRAJETS (celles que le cache conserve) sont hachées
+EMPREINTE_TRAJET_SQL = ("hashtext(concat_ws('|', utilisateur, \"startTime\", mode_transport, "
+                        "distance, duration_in_minutes, emission_co2))")
+DOSSIER_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'greenmove')
+
 # Configuration de style pour les graphiques
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 10
-plt.rcParams['axes.titlesize'] = 12
-plt.rcParams['axes.labelsize'] = 10
+matplotlib.style.use('seaborn-v0_8-darkgrid')
+# Palette "husl" à 6 couleurs (valeurs figées : seaborn n'est plus importé)
+matplotlib.rcParams['axes.prop_cycle'] = cycler(color=['#f77189', '#bb9832', '#50b131',
+                                                       '#36ada4', '#3ba3ec', '#e866f4'])
+matplotlib.rcParams['figure.figsize'] = (12, 6)
+matplotlib.rcParams['font.size'] = 10
+matplotlib.rcParams['axes.titlesize'] = 12
+matplotlib.rcParams['axes.labelsize'] = 10
+
+# Colonnes des agrégats par mode reprises dans les tableaux HTML et l'analyse textuelle
+COLONNES_TABLEAU_MODES = [('utilisateur', 'count'), ('distance', 'sum'), ('distance', 'mean'),
+                          ('duration_in_minutes', 'mean'), ('emission_co2', 'sum'),
+                          ('emission_co2', 'mean')]
+
+# Premier nombre de trajets de chaque segment d'activité au-delà du premier :
+# occasionnels (<10), moyens (10-19), actifs (20-50), très actifs (>50)
+BORNES_SEGMENTS = [10, 20, 51]
+
+# Blocs fixes de l'analyse textuelle
+SEPARATEUR_TEXTE = "=" * 80 + "\n"
+SOUS_SEPARATEUR_TEXTE = "-" * 80 + "\n"
+MODELE_MODE_TEXTE = """
+{mode}
+  • Nombre de trajets : {nb:.0f}
+  • Distance totale : {dist_tot:.1f} km
+  • Distance moyenne : {dist_moy:.2f} km
+  • Durée moyenne : {duree_moy:.1f} min
+  • Émissions totales : {co2_tot:.0f} g
+  • Émissions moyennes : {co2_moy:.1f} g
+  • Intensité carbone : {intensite:.1f} g CO₂/km
+"""
+# En-tête et vue d'ensemble de l'analyse textuelle
+MODELE_VUE_ENSEMBLE_TEXTE = """\
+{separateur}GREENMOVE - RAPPORT D'ANALYSE DES DÉPLACEMENTS
+{separateur}
+1. VUE D'ENSEMBLE
+{sous_separateur}Période d'analyse : du {debut:%d/%m/%Y} au {fin:%d/%m/%Y}
+
+• Nombre d'utilisateurs actifs : {nb_utilisateurs:,}
+• Nombre total de trajets : {nb_trajets:,}
+• Distance totale parcourue : {dist_tot:,.1f} km
+• Distance moyenne par trajet : {dist_moy:.2f} km
+• Durée totale : {duree_tot:,.0f} minutes ({heures:.0f} heures)
+• Émissions CO₂ totales : {co2_g:,.0f} g ({co2_kg:.1f} kg)
+
+"""
+# Section impact environnemental et équivalences de l'analyse textuelle
+MODELE_IMPACT_TEXTE = """
+
+3. IMPACT ENVIRONNEMENTAL
+{sous_separateur}Les trajets enregistrés ont généré {co2_kg:.1f} kg de CO₂.
+
+Équivalences :
+  • {tgv:.0f} trajets Paris-Lyon en TGV
+  • {vols:.2f} vols aller-retour Paris-New York
+  • {boeuf:.0f} kg de viande de bœuf produite
+  • {arbres:.0f} arbres nécessaires pour compenser (sur 1 an)
+
+"""
+# Bloc par mode du tableau comparatif (page 2 de l'analyse PDF)
+MODELE_MODE_PAGE = """\
+━━━ {mode} ━━━
+  Trajets : {nb:.0f} | Distance : {dist_tot:.1f} km | CO₂ : {co2_tot:.2f} kg
+  Moy/trajet : {dist_moy:.2f} km en {duree_moy:.1f} min | {co2_moy:.1f} g CO₂
+  Intensité : {intensite:.1f} g CO₂/km
+
+"""
+CONSEILS_REDUCTION_TEXTE = """\
+• Pour réduire l'empreinte carbone :
+  - Privilégier les transports en commun pour les trajets urbains
+  - Utiliser le vélo pour les trajets de moins de 5 km
+  - Covoiturer pour les trajets en voiture
+  - Regrouper les déplacements pour optimiser les trajets
+"""
+# En-têtes encadrés des encarts de texte des pages d'analyse PDF
+ENTETE_TOP_MODES = ("╔═══════════════════════════════╗\n"
+                    "║   TOP 3 MODES DE TRANSPORT   ║\n"
+                    "╚═══════════════════════════════╝\n\n")
+ENTETE_ANALYSE_MODES = ("╔════════════════════════════════════════════════════════════════════════════╗\n"
+                        "║                    ANALYSE COMPARATIVE DES MODES                           ║\n"
+                        "╚════════════════════════════════════════════════════════════════════════════╝\n\n")
+ENTETE_RECOMMANDATIONS = ("╔═══════════════════════════════╗\n"
+                          "║      RECOMMANDATIONS          ║\n"
+                          "╚═══════════════════════════════╝\n\n")
+ENTETE_SEGMENTATION = ("╔═══════════════════════════╗\n"
+                       "║  SEGMENTATION UTILISATEURS║\n"
+                       "╚═══════════════════════════╝\n\n")
+# Plan d'action de la page environnement (analyse PDF)
+PLAN_ACTION_TEXTE = """
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                          PLAN D'ACTION RECOMMANDÉ                            ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+🎯 OBJECTIFS
+   • Réduire les émissions de 20% sur 6 mois
+   • Augmenter la part des modes doux (vélo, marche) de 15%
+   • Sensibiliser 100% des utilisateurs
+
+📋 ACTIONS PRIORITAIRES
+
+   1. PROMOTION DES MODES DOUX
+      → Campagne de sensibilisation sur les trajets < 5 km
+      → Mise en place d'incitations (gamification, récompenses)
+      → Communication sur les bénéfices santé/environnement
+
+   2. OPTIMISATION DES DÉPLACEMENTS
+      → Encourager le covoiturage pour les trajets en voiture
+      → Développer les transports en commun pour les trajets moyens
+      → Créer des challenges inter-utilisateurs
+
+   3. SUIVI ET MESURE
+      → Dashboard mensuel des émissions par utilisateur
+      → Alertes automatiques si dépassement de seuils
+      → Rapports trimestriels avec comparaison d'objectifs
+
+   4. FORMATION ET ACCOMPAGNEMENT
+      → Guide des bonnes pratiques de mobilité durable
+      → Ateliers de sensibilisation au bilan carbone
+      → Coaching personnalisé pour les plus gros émetteurs
+
+🎖️ INDICATEURS DE SUCCÈS
+   ✓ Réduction de 20% des émissions CO₂
+   ✓ +15% de trajets en modes doux
+   ✓ Satisfaction utilisateurs > 80%
+   ✓ Engagement actif > 70% des utilisateurs
+"""
+# Encart d'insights de la page comportementale (analyse PDF)
+INSIGHTS_COMPORTEMENTAUX_TEXTE = """
+╔═════════════════════════════╗
+║   INSIGHTS COMPORTEMENTAUX  ║
+╚═════════════════════════════╝
+
+📊 OBSERVATIONS CLÉS
+
+• Distribution inégale
+  de l'activité entre
+  utilisateurs
+
+• Top 20% des utilisateurs
+  génèrent potentiellement
+  60-80% du trafic
+
+• Corrélation entre
+  fréquence d'usage et
+  diversité des modes
+
+💡 ACTIONS CIBLÉES
+
+→ Utilisateurs occasionnels:
+  Campagnes de réengagement
+
+→ Utilisateurs moyens:
+  Encourager régularité
+
+→ Utilisateurs actifs:
+  Gamification avancée
+  Ambassadeurs green
+
+→ Très actifs:
+  Programme VIP
+  Challenges personnalisés
+"""
+
+# Figure A4 paysage partagée par toutes les pages d'un même rapport (voir _figure_page)
+_figure_page_courante = None
+# Résolution des éléments rastérisés dans les PDF (le reste reste vectoriel)
+DPI_RASTER_PDF = 150
+
+def _figure_page():
+    """Renvoie la figure de page, vidée, au lieu d'en créer une nouvelle à chaque page
+    
+    Figure créée hors de pyplot (ni gestionnaire de fenêtre ni registre global),
+    conservée jusqu'à _fermer_figure_page. Mise en page contrainte : les
+    sous-graphiques sont placés pendant le rendu, sans tight_layout ni
+    recadrage bbox_inches='tight' (second rendu) à l'enregistrement.
+    """
+    global _figure_page_courante
+    if _figure_page_courante is None:
+        _figure_page_courante = Figure(figsize=(11.69, 8.27), layout='constrained')
+    else:
+        _figure_page_courante.clear()
+    return _figure_page_courante
+
+def _fermer_figure_page():
+    """Libère la figure de page à la fin d'un rapport"""
+    global _figure_page_courante
+    _figure_page_courante = None
+
+# Instance partagée par les tâches d'un processus de rendu (voir rendre_en_parallele)
+_instance_rendu = None
+
+def _initialiser_processus_rendu(instance):
+    """Installe l'instance commune aux tâches, transmise une fois par processus"""
+    global _instance_rendu
+    _instance_rendu = instance
+
+def _appeler_methode_rendu(nom, arguments):
+    """Exécute une méthode de l'instance installée par _initialiser_processus_rendu"""
+    return getattr(_instance_rendu, nom)(*arguments)
+
+def rendre_en_parallele(taches):
+    """Exécute des rendus indépendants, chacun dans son propre processus
+    
+    taches : liste de (libellé, fonction, arguments). Chaque processus a son
+    propre état matplotlib. Générateur : renvoie le libellé de chaque tâche dès
+    qu'elle est terminée, dans l'ordre de fin de rendu.
+    
+    Quand toutes les fonctions sont des méthodes d'une même instance (cas des
+    commandes du CLI), l'instance et son DataFrame sont transmis à
+    l'initialisation des processus (hérités sans copie avec fork) au lieu
+    d'être sérialisés avec chaque tâche. Le nombre de processus est borné par
+    le nombre de cœurs : chacun reçoit une copie de l'instance.
+    """
+    nombre_processus = min(len(taches), os.cpu_count() or 1)
+    if nombre_processus <= 1:
+        # Un seul rendu ou un seul cœur : rendus en séquence dans ce processus,
+        # sans état à transmettre
+        for libelle, fonction, arguments in taches:
+            fonction(*arguments)
+            yield libelle
+        return
+    
+    instances = {id(getattr(fonction, '__self__', None)): getattr(fonction, '__self__', None)
+                 for _, fonction, _ in taches}
+    instance = instances.popitem()[1] if len(instances) == 1 else None
+    if instance is not None:
+        taches = [(libelle, _appeler_methode_rendu, (fonction.__name__, arguments))
+                  for libelle, fonction, arguments in taches]
+    
+    with ProcessPoolExecutor(max_workers=nombre_processus, initializer=_initialiser_processus_rendu,
+                             initargs=(instance,)) as executor:
+        futures = {executor.submit(fonction, *arguments): libelle
+                   for libelle, fonction, arguments in taches}
+        for future in as_completed(futures):
+            future.result()
+            yield futures[future]
+
+def _ecrire_fragments(filename, fragments):
+    """Écrit un document fragment par fragment (tampon de 1 Mio)
+    
+    Le fichier est d'abord écrit à côté puis renommé : une section en erreur
+    ne laisse pas de rapport tronqué à la place du précédent.
+    """
+    temporaire = f'{filename}.{os.getpid()}.tmp'
+    try:
+        with open(temporaire, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            for fragment in fragments:
+                f.write(fragment)
+        os.replace(temporaire, filename)
+    finally:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+
+def _figure_svg(fig):
+    """Balisage SVG d'une figure (hors pyplot), à insérer tel quel dans une page HTML
+    
+    Graphiques vectoriels (camemberts, barres) : ni rastérisation Agg ni
+    encodage base64. Les textes restent du texte (svg.fonttype 'none').
+    Sans date ni identifiants aléatoires : mêmes données, même balisage.
+    """
+    tampon = StringIO()
+    with matplotlib.rc_context({'svg.fonttype': 'none', 'svg.hashsalt': 'greenmove'}):
+        fig.savefig(tampon, format='svg', metadata={'Date': None})
+    svg = tampon.getvalue()
+    # Sans le prologue XML ni le DOCTYPE, invalides au milieu d'un document HTML
+    return svg[svg.index('<svg'):]
+
+def _histogramme(ax, valeurs, classes, etendue=None, **kwargs):
+    """Histogramme calculé par np.histogram et tracé en un seul ax.bar
+    
+    Remplace Series.hist : valeurs non finies ignorées, pas de Series intermédiaire.
+    etendue : (min, max) déjà connus de valeurs toutes finies ; évite le
+    filtrage et le parcours de recherche des extrêmes de np.histogram.
+    """
+    if etendue is None:
+        valeurs = valeurs[np.isfinite(valeurs)]
+    comptes, bornes = np.histogram(valeurs, bins=classes, range=etendue)
+    ax.bar(bornes[:-1], comptes, width=np.diff(bornes), align='edge', **kwargs)
+    ax.grid(True)
+
+def _carte_chaleur(ax, valeurs, colonnes, lignes, legende):
+    """Carte de chaleur d'une petite matrice : une image imshow et sa barre de couleurs
+    
+    Remplace sns.heatmap (validation, PatchCollection d'une cellule par valeur).
+    Renvoie l'image, dont la normalisation sert à choisir la couleur des annotations.
+    """
+    image = ax.imshow(valeurs, aspect='auto', cmap='YlOrRd')
+    ax.figure.colorbar(image, ax=ax, label=legende)
+    ax.set_xticks(np.arange(len(colonnes)))
+    ax.set_xticklabels(colonnes)
+    ax.set_yticks(np.arange(len(lignes)))
+    ax.set_yticklabels(lignes)
+    ax.grid(False)
+    return image
+
+def _couleurs_intensite(intensites, couleurs=('green', 'orange', 'red')):
+    """Couleur de chaque barre d'intensité carbone (g CO₂/km) : < 50, < 150, au-delà
+    
+    Une comparaison vectorielle par seuil (np.select) au lieu d'une boucle Python.
+    """
+    valeurs = np.asarray(intensites, dtype=np.float64)
+    return np.select([valeurs < 50, valeurs < 150], list(couleurs[:2]), default=couleurs[2]).tolist()
+
+def _sommes_et_nombres(df, colonnes=COLONNES_NUMERIQUES):
+    """Somme (float64) et nombre de valeurs renseignées de chaque métrique float32
+    
+    Un seul masque NaN par colonne sert à la somme et au comptage ; la
+    moyenne s'en déduit (somme / nombre) sans second parcours.
+    """
+    sommes, nombres = {}, {}
+    for col in colonnes:
+        valeurs = df[col].to_numpy()
+        masque = ~np.isnan(valeurs)
+        sommes[col] = valeurs.sum(where=masque, dtype=np.float64)
+        nombres[col] = np.count_nonzero(masque)
+    return sommes, nombres
+
+def _ajouter_ratios_globaux(stats):
+    """Complète stats_globales avec les ratios lus tels quels par les pages et analyses
+    
+    intensite_globale en g CO₂/km (0 sans distance), moyennes par
+    utilisateur en trajets et en kg CO₂ (0 sans utilisateur).
+    """
+    stats['intensite_globale'] = (stats['emission_totale'] * 1000 / stats['distance_totale']
+                                  if stats['distance_totale'] > 0 else 0)
+    nombre_utilisateurs = stats['nombre_utilisateurs']
+    stats['trajets_par_utilisateur'] = (stats['nombre_trajets'] / nombre_utilisateurs
+                                        if nombre_utilisateurs else 0)
+    stats['emission_par_utilisateur'] = (stats['emission_totale'] / nombre_utilisateurs
+                                         if nombre_utilisateurs else 0)
+
+def _instants_locaux(depart):
+    """Horodatages de départ en heure locale (datetime64[ns] sans fuseau, NaT si manquant)
+    
+    Simple lecture du tableau de la colonne : ni tri, ni copie de self.df.
+    """
+    if depart.dt.tz is not None:
+        depart = depart.dt.tz_localize(None)
+    return depart.to_numpy().astype('datetime64[ns]', copy=False)
+
+def _sommes_par_code(codes, valeurs, nombre_codes, comptes=None):
+    """Somme et nombre de valeurs renseignées par code de catégorie (codes -1 et NaN ignorés)
+    
+    comptes (nombre de lignes par code, déjà calculé par l'appelant) est
+    repris tel quel quand la métrique n'a aucune valeur manquante : un seul
+    passage np.bincount au lieu de deux.
+    """
+    manquants = np.isnan(valeurs)
+    renseignes = codes >= 0
+    if manquants.any():
+        renseignes &= ~manquants
+    elif comptes is not None:
+        return np.bincount(codes[renseignes], weights=valeurs[renseignes],
+                           minlength=nombre_codes), comptes
+    sommes = np.bincount(codes[renseignes], weights=valeurs[renseignes], minlength=nombre_codes)
+    nombres = np.bincount(codes[renseignes], minlength=nombre_codes)
+    return sommes, nombres
+
+def _segment_activite(trajets):
+    """Indice du segment d'activité (0 = occasionnel ... 3 = très actif) de chaque nombre de trajets"""
+    return np.searchsorted(BORNES_SEGMENTS, trajets, side='right')
+
+def _plus_grands(serie, n):
+    """Les n plus grandes valeurs d'une série, par ordre décroissant
+    
+    Sélection partielle (np.argpartition) puis tri des seuls n gagnants ;
+    parmi les gagnants, les égalités gardent l'ordre de la série.
+    """
+    valeurs = serie.to_numpy()
+    n = min(n, len(valeurs))
+    if n <= 0:
+        return serie.iloc[:0]
+    meilleurs = np.sort(np.argpartition(valeurs, -n)[-n:])
+    return serie.iloc[meilleurs[np.argsort(-valeurs[meilleurs], kind='stable')]]
+
+def _barres(ax, serie, horizontal=False, **kwargs):
+    """Trace une série en barres avec un seul appel matplotlib (sans Series.plot)
+    
+    Reproduit la présentation de Series.plot(kind='bar'/'barh') : barres
+    de largeur 0.5, une graduation par catégorie, nom de l'index en légende d'axe.
+    """
+    positions = np.arange(len(serie))
+    if horizontal:
+        ax.barh(positions, serie.to_numpy(), height=0.5, **kwargs)
+        ax.set_yticks(positions)
+        ax.set_yticklabels(serie.index.to_numpy())
+        if serie.index.name:
+            ax.set_ylabel(serie.index.name)
+    else:
+        ax.bar(positions, serie.to_numpy(), width=0.5, **kwargs)
+        ax.set_xticks(positions)
+        ax.set_xticklabels(serie.index.to_numpy(), rotation=90)
+        if serie.index.name:
+            ax.set_xlabel(serie.index.name)
 
 class GreenmoveAnalytics:
     """Classe pour l'analyse des données Greenmove"""
     
     def __init__(self, host, database, user, password, port=5432):
-        """Initialise la connexion à la base de données"""
+        """Initialise les paramètres de connexion (la connexion est ouverte au premier besoin)"""
         self.conn_params = {
             'host': host,
             'database': database,
@@ -50,10 +473,33 @@ class GreenmoveAnalytics:
             'password': password,
             'port': port
         }
+        self._conn = None
         self.df = None
         self.stats_globales = {}
+        self.agregats_modes = None
+        self.intensite_modes = None
+        self.agregats_utilisateurs = None
+        self.positions_utilisateurs = None
+        self.codes_categories = {}
+        self.trajets_courts_par_mode = None
+        self.vitesses_modes = None
+        self.co2_cumule = None
+        self.tableau_modes = None
         self.output_format = 'pdf'  # Format par défaut
         
+    def __getstate__(self):
+        """État transmis aux processus de rendu : tout sauf la connexion PostgreSQL
+        
+        Les index par ligne (positions par utilisateur, codes catégoriels) sont
+        aussi écartés : recalculables à partir de self.df, ils alourdiraient
+        chaque envoi vers un processus.
+        """
+        etat = self.__dict__.copy()
+        etat['_conn'] = None
+        etat['positions_utilisateurs'] = None
+        etat['codes_categories'] = {}
+        return etat
+    
     def set_output_format(self, format='pdf'):
         """Définit le format de sortie : 'pdf' ou 'html'"""
         if format.lower() not in ['pdf', 'html']:
@@ -61,61 +507,516 @@ class GreenmoveAnalytics:
         self.output_format = format.lower()
         print(f"✓ Format de sortie défini : {self.output_format.upper()}")
         
-    def connect_and_load_data(self):
-        """Charge les données depuis PostgreSQL"""
+    def _connexion(self):
+        """Renvoie la connexion PostgreSQL, ouverte au premier appel puis réutilisée"""
+        if self._conn is None or self._conn.closed:
+            # Import différé : inutile tant qu'aucune requête n'est faite (cache, HTML, texte)
+            import psycopg2
+            self._conn = psycopg2.connect(**self.conn_params)
+            # Lectures seules : pas de transaction laissée ouverte entre deux requêtes
+            self._conn.autocommit = True
+        return self._conn
+    
+    def fermer_connexion(self):
+        """Ferme la connexion PostgreSQL si elle est ouverte"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def connect_and_load_data(self, user_id=None, cache=True):
+        """Charge les données depuis PostgreSQL
+        
+        Si user_id est fourni (identifiant ou liste d'identifiants), seuls les
+        trajets de ces utilisateurs sont lus (filtre appliqué côté serveur), avec
+        toutes les colonnes de COLONNES_TRAJETS. Avec cache=True, le DataFrame est
+        conservé sur disque et relu tant que les lignes lues n'ont pas changé
+        (insertion, suppression ou mise à jour, voir _chemin_cache).
+        """
         try:
-            conn = psycopg2.connect(**self.conn_params)
-            query = """
-                SELECT 
-                    utilisateur,
-                    "startTime" as start_time,
-                    mode_transport,
-                    distance,
-                    duration_in_minutes,
-                    emission_co2
-                FROM tripanalyse.usagestat
-                ORDER BY "startTime"
-            """
-            self.df = pd.read_sql_query(query, conn)
-            conn.close()
+            conn = self._connexion()
+            if isinstance(user_id, (list, tuple)):
+                filtre = 'WHERE utilisateur = ANY(%(utilisateur)s)'
+                user_id = list(user_id)
+            else:
+                filtre = 'WHERE utilisateur = %(utilisateur)s' if user_id is not None else ''
+            params = {'utilisateur': user_id} if user_id is not None else None
+            
+            chemin_cache = self._chemin_cache(conn, filtre, params) if cache else None
+            if chemin_cache and os.path.exists(chemin_cache):
+                self.df = pd.read_pickle(chemin_cache)
+                # Cache écrit avant le typage actuel : conversion unique ici,
+                # les regroupements reposent sur les codes entiers et les
+                # parcours des métriques sur des colonnes float32
+                for col in self.df.columns.intersection(COLONNES_CATEGORIELLES):
+                    if not isinstance(self.df[col].dtype, pd.CategoricalDtype):
+                        self.df[col] = self.df[col].astype('category')
+                for col in self.df.columns.intersection(COLONNES_NUMERIQUES):
+                    if self.df[col].dtype != np.float32:
+                        self.df[col] = self.df[col].astype(np.float32)
+                source = " (cache local)"
+            else:
+                self.df = self._lire_trajets(conn, filtre, params)
+                source = ""
+                if chemin_cache:
+                    self._ecrire_cache(chemin_cache)
+            self._rendre_metriques_contigues()
             
-            # Conversion des types
-            self.df['start_time'] = pd.to_datetime(self.df['start_time'])
-            self.df['distance'] = pd.to_numeric(self.df['distance'], errors='coerce')
-            self.df['duration_in_minutes'] = pd.to_numeric(self.df['duration_in_minutes'], errors='coerce')
-            self.df['emission_co2'] = pd.to_numeric(self.df['emission_co2'], errors='coerce')
+            # Nouvelles données : les statistiques en cache ne sont plus valides
+            self.stats_globales = {}
+            self.agregats_modes = None
+            self.intensite_modes = None
+            self.agregats_utilisateurs = None
+            self.positions_utilisateurs = None
+            self.codes_categories = {}
+            self.trajets_courts_par_mode = None
+            self.vitesses_modes = None
+            self.co2_cumule = None
+            self.tableau_modes = None
             
-            print(f"✓ Données chargées : {len(self.df)} trajets")
+            print(f"✓ Données chargées : {len(self.df)} trajets{source}")
             return True
         except Exception as e:
             print(f"✗ Erreur de connexion : {e}")
             return False
     
+    def _lire_trajets(self, conn, filtre, params):
+        """Lit les trajets depuis PostgreSQL et renvoie un DataFrame typé"""
+        selection = ',\n                '.join(EXPRESSIONS_SQL.get(c, c) for c in COLONNES_TRAJETS)
+        query = f"""
+            SELECT 
+                {selection}
+            FROM tripanalyse.usagestat
+            {filtre}
+            ORDER BY "startTime"
+        """
+        # Export COPY côté serveur, relu par le parseur CSV (en C) de pandas :
+        # pas de tuple Python par ligne comme avec read_sql_query.
+        # Au-delà de TAILLE_TAMPON_COPY, l'export brut passe sur disque au lieu
+        # de rester en mémoire à côté du DataFrame en construction.
+        with tempfile.SpooledTemporaryFile(max_size=TAILLE_TAMPON_COPY) as tampon:
+            with conn.cursor() as cur:
+                copie = cur.mogrify(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", params)
+                cur.copy_expert(copie.decode(), tampon)
+            tampon.seek(0)
+            
+            # Lecture par blocs : chaque bloc est typé avant la concaténation.
+            # Les colonnes de regroupement sont lues directement en catégories
+            # (codes entiers au lieu de chaînes), sans colonne objet intermédiaire.
+            categorielles = COLONNES_CATEGORIELLES
+            types = {col: np.float32 for col in COLONNES_NUMERIQUES}
+            types.update({col: 'category' for col in categorielles})
+            morceaux = [self._typer_morceau(morceau)
+                        for morceau in pd.read_csv(tampon, dtype=types,
+                                                   chunksize=TAILLE_BLOC_SQL)]
+        if not morceaux:
+            df = self._typer_morceau(pd.DataFrame(columns=COLONNES_TRAJETS))
+            for col in categorielles:
+                df[col] = df[col].astype('category')
+            return df
+        
+        # Catégories communes (triées) à tous les blocs : sinon concat
+        # retomberait sur des chaînes Python
+        for col in categorielles:
+            categories = union_categoricals([m[col] for m in morceaux],
+                                            sort_categories=True).categories
+            for morceau in morceaux:
+                morceau[col] = morceau[col].cat.set_categories(categories)
+        return pd.concat(morceaux, ignore_index=True)
+    
+    def _chemin_cache(self, conn, filtre, params):
+        """Chemin du cache local, dérivé d'une sonde d'agrégats sur la table
+        
+        Le nom combine la source (hôte, base, filtre, colonnes) et l'état de la table :
+        dernier départ, nombre de lignes et somme des empreintes (EMPREINTE_TRAJET_SQL)
+        des colonnes conservées. Une insertion, une suppression ou une mise à jour
+        en place (ex. correction des distances et émissions) change donc le nom.
+        
+        La sonde parcourt toutes les lignes sélectionnées et hache six colonnes
+        par ligne, à chaque chargement, cache trouvé ou non : elle évite le
+        transfert des trajets, pas leur lecture côté serveur.
+        """
+        with conn.cursor() as cur:
+            cur.execute(f'''SELECT max("startTime"), count(*), sum({EMPREINTE_TRAJET_SQL})
+                            FROM tripanalyse.usagestat {filtre}''', params)
+            dernier_depart, nombre, empreinte = cur.fetchone()
+        
+        etat = hashlib.blake2b(f"{dernier_depart}|{nombre}|{empreinte}".encode(),
+                               digest_size=8).hexdigest()
+        source = f"{self.conn_params['host']}|{self.conn_params['database']}|{params}|{COLONNES_TRAJETS}"
+        prefixe = hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+        return os.path.join(DOSSIER_CACHE, f'trajets_{prefixe}_{etat}.pkl')
+    
+    def _ecrire_cache(self, chemin_cache):
+        """Écrit self.df dans le cache (écriture atomique) et supprime les versions périmées"""
+        os.makedirs(DOSSIER_CACHE, exist_ok=True)
+        prefixe = os.path.basename(chemin_cache).rsplit('_', 1)[0]
+        for ancien in glob.glob(os.path.join(DOSSIER_CACHE, f'{prefixe}_*.pkl')):
+            os.remove(ancien)
+        temporaire = f'{chemin_cache}.{os.getpid()}.tmp'
+        self.df.to_pickle(temporaire)
+        os.replace(temporaire, chemin_cache)
+    
+    def _rendre_metriques_contigues(self):
+        """Garantit un tableau contigu par métrique avant les parcours en colonnes
+        
+        Après concat ou lecture d'un pickle, une colonne peut n'être qu'une vue
+        à pas non unitaire dans un bloc 2D ; elle est alors recopiée une fois ici
+        plutôt qu'à chaque to_numpy() des agrégations.
+        """
+        for col in self.df.columns.intersection(COLONNES_NUMERIQUES):
+            valeurs = self.df[col].to_numpy()
+            if not valeurs.flags.c_contiguous:
+                self.df[col] = np.ascontiguousarray(valeurs)
+    
+    @staticmethod
+    def _typer_morceau(morceau):
+        """Convertit les types d'un bloc de trajets lu depuis PostgreSQL"""
+        if 'start_time' in morceau:
+            morceau['start_time'] = pd.to_datetime(morceau['start_time'], format=FORMAT_DATE_SQL)
+        for col in morceau.columns.intersection(COLONNES_NUMERIQUES):
+            # Colonnes déjà lues en float32 par read_csv : pas de copie supplémentaire
+            if morceau[col].dtype != np.float32:
+                morceau[col] = pd.to_numeric(morceau[col], errors='coerce').astype(np.float32)
+        return morceau
+    
     def calculer_statistiques_globales(self):
-        """Calcule les statistiques globales"""
+        """Calcule les statistiques globales (mémorisées jusqu'au prochain chargement)"""
+        if self.stats_globales:
+            return self.stats_globales
+        
+        # Métriques stockées en float32 : totaux accumulés en float64,
+        # moyennes = total / nombre de valeurs renseignées
+        sommes, renseignes = _sommes_et_nombres(self.df)
+        periode = self.df['start_time'].agg(['min', 'max'])
+        
         self.stats_globales = {
-            'nombre_utilisateurs': self.df['utilisateur'].nunique(),
+            # Utilisateurs distincts : lignes des agrégats par utilisateur,
+            # préparés ici une fois pour les classements des rapports
+            'nombre_utilisateurs': len(self._agregats_par_utilisateur()),
             'nombre_trajets': len(self.df),
-            'distance_totale': self.df['distance'].sum(),
-            'distance_moyenne': self.df['distance'].mean(),
-            'duree_totale': self.df['duration_in_minutes'].sum(),
-            'duree_moyenne': self.df['duration_in_minutes'].mean(),
-            'emission_totale': self.df['emission_co2'].sum(),
-            'emission_moyenne': self.df['emission_co2'].mean(),
-            'periode_debut': self.df['start_time'].min(),
-            'periode_fin': self.df['start_time'].max()
+            'distance_totale': sommes['distance'],
+            'distance_moyenne': sommes['distance'] / renseignes['distance'],
+            'duree_totale': sommes['duration_in_minutes'],
+            'duree_moyenne': sommes['duration_in_minutes'] / renseignes['duration_in_minutes'],
+            'emission_totale': sommes['emission_co2'],
+            'emission_moyenne': sommes['emission_co2'] / renseignes['emission_co2'],
+            'periode_debut': periode['min'],
+            'periode_fin': periode['max']
         }
+        _ajouter_ratios_globaux(self.stats_globales)
         
         # Statistiques par mode de transport
-        self.stats_par_mode = self.df.groupby('mode_transport').agg({
-            'utilisateur': 'count',
-            'distance': ['sum', 'mean'],
-            'duration_in_minutes': ['sum', 'mean'],
-            'emission_co2': ['sum', 'mean']
-        }).round(2)
+        self.stats_par_mode = self._agregats_par_mode().round(2)
         
         return self.stats_globales
     
+    def _codes(self, colonne):
+        """Codes entiers d'une colonne catégorielle (-1 si manquant), extraits une fois par chargement"""
+        if colonne not in self.codes_categories:
+            self.codes_categories[colonne] = self.df[colonne].cat.codes.to_numpy()
+        return self.codes_categories[colonne]
+    
+    def _agregats_par_mode(self):
+        """Agrégats par mode de transport, calculés une fois par chargement
+        
+        Colonnes : ('utilisateur', 'count') et ('sum', 'mean') pour chaque
+        métrique. Les pages et analyses lisent leurs séries dans ce tableau.
+        Les codes de la colonne catégorielle indexent directement des
+        accumulateurs np.bincount (un passage par métrique, sommes en float64).
+        """
+        if self.agregats_modes is None:
+            modes = self.df['mode_transport']
+            codes = self._codes('mode_transport')
+            nombre_modes = len(modes.cat.categories)
+            
+            # Un seul masque des modes renseignés : sert aux présences et aux comptages
+            valides = codes >= 0
+            trajets = np.bincount(codes[valides], minlength=nombre_modes)
+            presents = trajets > 0
+            # Trajets avec utilisateur : codes catégoriels déjà extraits, et
+            # recomptage seulement s'il manque des utilisateurs
+            sans_utilisateur = self._codes('utilisateur') < 0
+            if sans_utilisateur.any():
+                avec_utilisateur = np.bincount(codes[valides & ~sans_utilisateur],
+                                               minlength=nombre_modes)
+            else:
+                avec_utilisateur = trajets
+            colonnes = {('utilisateur', 'count'): avec_utilisateur}
+            with np.errstate(invalid='ignore', divide='ignore'):
+                for col in COLONNES_NUMERIQUES:
+                    sommes, nombres = _sommes_par_code(codes, self.df[col].to_numpy(), nombre_modes,
+                                                       trajets)
+                    colonnes[(col, 'sum')] = sommes
+                    colonnes[(col, 'mean')] = sommes / nombres
+            
+            agregats = pd.DataFrame(colonnes, index=modes.cat.categories.rename('mode_transport'))
+            # Comme observed=True : seuls les modes présents dans les données
+            self.agregats_modes = agregats[presents]
+        return self.agregats_modes
+    
+    def charger_statistiques_sql(self):
+        """Calcule les statistiques globales et par mode directement dans PostgreSQL
+        
+        Alternative à connect_and_load_data + calculer_statistiques_globales quand
+        seuls les agrégats sont utiles : une ligne par mode et une ligne de total
+        sont transférées au lieu de tous les trajets. self.df reste à None.
+        Les agrégats par mode alimentent aussi _agregats_par_mode : l'analyse
+        textuelle peut alors être générée sans charger les trajets.
+        """
+        query = """
+            SELECT 
+                GROUPING(mode_transport) = 1 AS total,
+                mode_transport,
+                count(*) AS nombre_trajets,
+                count(utilisateur) AS trajets_avec_utilisateur,
+                count(DISTINCT utilisateur) AS nombre_utilisateurs,
+                sum(distance) AS distance_sum,
+                avg(distance) AS distance_mean,
+                sum(duration_in_minutes) AS duree_sum,
+                avg(duration_in_minutes) AS duree_mean,
+                sum(emission_co2) AS emission_sum,
+                avg(emission_co2) AS emission_mean,
+                min("startTime") AS debut,
+                max("startTime") AS fin,
+                count(*) FILTER (WHERE distance < 5) AS trajets_courts
+            FROM tripanalyse.usagestat
+            GROUP BY ROLLUP (mode_transport)
+        """
+        try:
+            with self._connexion().cursor() as cur:
+                cur.execute(query)
+                agregats = pd.DataFrame(cur.fetchall(), columns=[d[0] for d in cur.description])
+        except Exception as e:
+            print(f"✗ Erreur de connexion : {e}")
+            return False
+        
+        # numeric PostgreSQL -> Decimal : conversion en flottants
+        metriques = ['distance_sum', 'distance_mean', 'duree_sum', 'duree_mean',
+                     'emission_sum', 'emission_mean']
+        agregats[metriques] = agregats[metriques].astype(float)
+        total = agregats[agregats['total']].iloc[0]
+        # Comme observed=True côté pandas : pas de groupe pour les modes manquants
+        par_mode = agregats[~agregats['total'] & agregats['mode_transport'].notna()]
+        par_mode = par_mode.set_index('mode_transport')
+        
+        self.stats_globales = {
+            'nombre_utilisateurs': total['nombre_utilisateurs'],
+            'nombre_trajets': total['nombre_trajets'],
+            'distance_totale': total['distance_sum'],
+            'distance_moyenne': total['distance_mean'],
+            'duree_totale': total['duree_sum'],
+            'duree_moyenne': total['duree_mean'],
+            'emission_totale': total['emission_sum'],
+            'emission_moyenne': total['emission_mean'],
+            'periode_debut': pd.Timestamp(total['debut']),
+            'periode_fin': pd.Timestamp(total['fin'])
+        }
+        _ajouter_ratios_globaux(self.stats_globales)
+        
+        # Même structure que _agregats_par_mode
+        self.agregats_modes = pd.DataFrame({
+            ('utilisateur', 'count'): par_mode['trajets_avec_utilisateur'],
+            ('distance', 'sum'): par_mode['distance_sum'],
+            ('distance', 'mean'): par_mode['distance_mean'],
+            ('duration_in_minutes', 'sum'): par_mode['duree_sum'],
+            ('duration_in_minutes', 'mean'): par_mode['duree_mean'],
+            ('emission_co2', 'sum'): par_mode['emission_sum'],
+            ('emission_co2', 'mean'): par_mode['emission_mean']
+        })
+        self.stats_par_mode = self.agregats_modes.round(2)
+        self.intensite_modes = None
+        self.trajets_courts_par_mode = par_mode['trajets_courts']
+        
+        print(f"✓ Statistiques calculées côté serveur : {self.stats_globales['nombre_trajets']} trajets")
+        return True
+    
+    def top_utilisateurs_sql(self, n=5):
+        """Les n utilisateurs ayant le plus de trajets, classés par PostgreSQL
+        
+        Seuls les n identifiants sont transférés ; combiné à
+        connect_and_load_data(user_id=[...]), seuls leurs trajets sont lus.
+        Renvoie None en cas d'erreur.
+        """
+        query = """
+            SELECT utilisateur
+            FROM tripanalyse.usagestat
+            WHERE utilisateur IS NOT NULL
+            GROUP BY utilisateur
+            ORDER BY count(*) DESC
+            LIMIT %s
+        """
+        try:
+            with self._connexion().cursor() as cur:
+                cur.execute(query, (n,))
+                return [ligne[0] for ligne in cur.fetchall()]
+        except Exception as e:
+            print(f"✗ Erreur de connexion : {e}")
+            return None
+    
+    def _intensite_par_mode(self):
+        """Intensité carbone par mode (g CO₂/km), calculée une fois à partir des agrégats"""
+        if self.intensite_modes is None:
+            agg_modes = self._agregats_par_mode()
+            self.intensite_modes = (agg_modes[('emission_co2', 'sum')] * 1000) / agg_modes[('distance', 'sum')]
+        return self.intensite_modes
+    
+    def _tableau_modes(self):
+        """Agrégats par mode arrondis (COLONNES_TABLEAU_MODES) suivis de l'intensité carbone
+        
+        L'intensité (g CO₂/km, 0 si aucune distance) est calculée en une
+        opération sur toute la colonne, à partir des valeurs arrondies affichées.
+        Tableau construit une fois par chargement et partagé par les tableaux
+        HTML, la page PDF et l'analyse texte (lecture seule).
+        """
+        if self.tableau_modes is None:
+            tableau = self._agregats_par_mode()[COLONNES_TABLEAU_MODES].round(2)
+            distance = tableau[('distance', 'sum')]
+            tableau[('intensite', '')] = (tableau[('emission_co2', 'sum')] * 1000
+                                          / distance.where(distance > 0)).fillna(0)
+            self.tableau_modes = tableau
+        return self.tableau_modes
+    
+    def _mode_plus_emetteur(self):
+        """Mode le plus émetteur et sa part (%) des émissions totales
+        
+        Un seul argmax sur les sommes déjà accumulées par _agregats_par_mode.
+        """
+        emissions = self._agregats_par_mode()[('emission_co2', 'sum')]
+        i = emissions.to_numpy().argmax()
+        return emissions.index[i], emissions.iat[i] / self.stats_globales['emission_totale'] * 100
+    
+    def _agregats_par_utilisateur(self):
+        """Nombre de trajets, distance et émissions par utilisateur, calculés une fois par chargement
+        
+        Accumulation np.bincount sur les codes de la colonne catégorielle
+        (sommes en float64), restreinte aux utilisateurs présents. Les pages
+        PDF et HTML y prennent leurs classements (_plus_grands) sans regrouper à nouveau.
+        """
+        if self.agregats_utilisateurs is None:
+            utilisateurs = self.df['utilisateur'].cat.categories
+            codes = self._codes('utilisateur')
+            trajets = np.bincount(codes[codes >= 0], minlength=len(utilisateurs))
+            colonnes = {'trajets': trajets}
+            for col in ('distance', 'emission_co2'):
+                colonnes[col], _ = _sommes_par_code(codes, self.df[col].to_numpy(), len(utilisateurs),
+                                                    trajets)
+            presents = trajets > 0
+            self.agregats_utilisateurs = pd.DataFrame(
+                {col: valeurs[presents] for col, valeurs in colonnes.items()},
+                index=utilisateurs[presents].rename('utilisateur')
+            )
+        return self.agregats_utilisateurs
+    
+    def _segments_utilisateurs(self):
+        """Nombre d'utilisateurs par segment d'activité, en un seul comptage
+        
+        Les nombres de trajets (entiers) sont classés par _segment_activite
+        ([0,10[, [10,20[, [20,50], ]50,∞[) puis comptés avec np.bincount.
+        """
+        trajets_par_user = self._agregats_par_utilisateur()['trajets'].to_numpy()
+        comptes = np.bincount(_segment_activite(trajets_par_user), minlength=4)
+        return {
+            'Très actifs (>50 trajets)': int(comptes[3]),
+            'Actifs (20-50)': int(comptes[2]),
+            'Moyens (10-19)': int(comptes[1]),
+            'Occasionnels (<10)': int(comptes[0])
+        }
+    
+    def _vitesse_par_mode(self):
+        """Vitesse moyenne (km/h) par mode, calculée une fois par chargement
+        
+        Moyenne des vitesses de chaque trajet, accumulée par code de mode
+        (np.bincount) sans ajouter de colonne à self.df. Les trajets de durée
+        nulle ou négative n'ont pas de vitesse (NaN, ignorés comme les valeurs
+        manquantes) : une vitesse infinie rendrait la moyenne du mode infinie.
+        """
+        if self.vitesses_modes is None:
+            modes = self.df['mode_transport'].cat.categories
+            duree = self.df['duration_in_minutes'].to_numpy(np.float64)
+            positives = duree > 0
+            # Calcul en place dans un seul tableau float64 : ni produit ni
+            # quotient intermédiaires de la taille du DataFrame
+            vitesse = self.df['distance'].to_numpy(np.float64, copy=True)
+            vitesse *= 60
+            np.divide(vitesse, duree, out=vitesse, where=positives)
+            vitesse[~positives] = np.nan
+            with np.errstate(invalid='ignore', divide='ignore'):
+                sommes, nombres = _sommes_par_code(self._codes('mode_transport'), vitesse, len(modes))
+                moyennes = pd.Series(sommes / nombres, index=modes.rename('mode_transport'))
+            # Mêmes modes que les agrégats (modes présents dans les données)
+            self.vitesses_modes = moyennes.reindex(self._agregats_par_mode().index)
+        return self.vitesses_modes
+    
+    def top_utilisateurs(self, n=5):
+        """Les n utilisateurs ayant le plus de trajets, du plus actif au moins actif
+        
+        Nombres de trajets lus dans _agregats_par_utilisateur puis sélection
+        partielle (_plus_grands) : seuls les n gagnants sont triés.
+        """
+        return _plus_grands(self._agregats_par_utilisateur()['trajets'], n).index
+    
+    def _trajets_courts_voiture(self, distance_max=5):
+        """Nombre de trajets en voiture de moins de distance_max km
+        
+        Comparaison sur les codes de la colonne catégorielle et les tableaux
+        NumPy sous-jacents, sans Series booléennes ni DataFrame filtré.
+        Au seuil par défaut (5 km), le décompte par mode est calculé une fois
+        par chargement (np.bincount des codes des trajets courts) et partagé
+        par la page d'analyse et l'analyse textuelle ; sans trajets chargés,
+        il vient des agrégats de charger_statistiques_sql.
+        """
+        if self.df is None:
+            return int(self.trajets_courts_par_mode.get('car', 0))
+        modes = self.df['mode_transport']
+        codes = self._codes('mode_transport')
+        if distance_max != 5:
+            code_voiture = modes.cat.categories.get_indexer(['car'])[0]
+            if code_voiture < 0:
+                return 0
+            courts = self.df['distance'].to_numpy() < distance_max
+            return int(np.count_nonzero((codes == code_voiture) & courts))
+        if self.trajets_courts_par_mode is None:
+            codes_courts = codes[self.df['distance'].to_numpy() < distance_max]
+            self.trajets_courts_par_mode = pd.Series(
+                np.bincount(codes_courts[codes_courts >= 0], minlength=len(modes.cat.categories)),
+                index=modes.cat.categories)
+        return int(self.trajets_courts_par_mode.get('car', 0))
+    
+    def _composantes_horaires(self):
+        """Jour, jour de la semaine (0 = lundi) et heure de chaque départ, en un passage NumPy
+        
+        Les départs sont pris en heure locale ; les horodatages manquants sont ignorés.
+        """
+        instants = _instants_locaux(self.df['start_time'])
+        instants = instants[~np.isnat(instants)]
+        jours = instants.astype('datetime64[D]')
+        # Le 1er janvier 1970 était un jeudi (3 avec lundi = 0).
+        # uint8 : un octet par trajet, et jour * 24 + heure (≤ 167) tient encore
+        jour_semaine = ((jours.view('i8') + 3) % 7).astype(np.uint8)
+        heure = ((instants.view('i8') // 3_600_000_000_000) % 24).astype(np.uint8)
+        return jours, jour_semaine, heure
+    
+    def _co2_cumule_journalier(self):
+        """Émissions cumulées (déjà en kg) au pas journalier : un point par jour au lieu d'un par trajet
+        
+        Sommes par numéro de jour (np.bincount pondéré, en float64) sans tri ni
+        Series indexée par trajet ; jours sans trajet inclus, comme resample('D').
+        Calculées une fois par chargement (pages émissions et environnement).
+        """
+        if self.co2_cumule is not None:
+            return self.co2_cumule
+        jours = _instants_locaux(self.df['start_time']).astype('datetime64[D]')
+        dates = ~np.isnat(jours)
+        numeros = jours[dates].view('i8')
+        emissions = np.nan_to_num(self.df['emission_co2'].to_numpy()[dates], nan=0.0)
+        premier = numeros.min() if len(numeros) else 0
+        sommes = np.bincount(numeros - premier, weights=emissions)
+        index = pd.DatetimeIndex((np.arange(len(sommes)) + premier).astype('datetime64[D]'),
+                                 name='start_time')
+        # Cumul sur quelques centaines de totaux journaliers, pas sur les trajets
+        self.co2_cumule = pd.Series(np.cumsum(sommes), index=index)
+        return self.co2_cumule
+    
     def generer_rapport_pdf(self, filename='rapport_greenmove.pdf', format='pdf'):
         """Génère le rapport complet en PDF ou HTML"""
         # Si format HTML, rediriger vers la méthode HTML
@@ -124,57 +1025,54 @@ class GreenmoveAnalytics:
             return self.generer_rapport_html(filename)
         
         # Sinon, générer le PDF
-        with PdfPages(filename) as pdf:
-            # Page 1: Vue d'ensemble
-            self._page_vue_ensemble(pdf)
-            
-            # Page 2: Analyse par mode de transport
-            self._page_analyse_modes(pdf)
-            
-            # Page 3: Distribution des distances
-            self._page_distribution_distances(pdf)
-            
-            # Page 4: Analyse temporelle
-            self._page_analyse_temporelle(pdf)
-            
-            # Page 5: Émissions CO2
-            self._page_emissions_co2(pdf)
-            
-            # Page 6: Top utilisateurs
-            self._page_top_utilisateurs(pdf)
-            
-            # Métadonnées du PDF
-            d = pdf.infodict()
-            d['Title'] = 'Rapport Greenmove - Analyse des Déplacements'
-            d['Author'] = 'Greenmove Analytics'
-            d['Subject'] = 'Analyse de mobilité'
-            d['CreationDate'] = datetime.now()
+        from matplotlib.backends.backend_pdf import PdfPages
+        
+        # Figure de page fermée même si un rendu échoue
+        try:
+            with PdfPages(filename) as pdf:
+                # Page 1: Vue d'ensemble
+                self._page_vue_ensemble(pdf)
+                
+                # Page 2: Analyse par mode de transport
+                self._page_analyse_modes(pdf)
+                
+                # Page 3: Distribution des distances
+                self._page_distribution_distances(pdf)
+                
+                # Page 4: Analyse temporelle
+                self._page_analyse_temporelle(pdf)
+                
+                # Page 5: Émissions CO2
+                self._page_emissions_co2(pdf)
+                
+                # Page 6: Top utilisateurs
+                self._page_top_utilisateurs(pdf)
+                
+                # Métadonnées du PDF
+                d = pdf.infodict()
+                d['Title'] = 'Rapport Greenmove - Analyse des Déplacements'
+                d['Author'] = 'Greenmove Analytics'
+                d['Subject'] = 'Analyse de mobilité'
+                d['CreationDate'] = datetime.now()
+        finally:
+            _fermer_figure_page()
         
         print(f"✓ Rapport PDF généré : {filename}")
     
     def generer_rapport_html(self, filename='rapport_greenmove_global.html'):
         """Génère le rapport complet en HTML avec graphiques interactifs"""
-        import base64
-        from io import BytesIO
-        
-        # Créer le HTML
-        html_content = self._generer_html_rapport_global()
-        
-        # Sauvegarder
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # Chaque section est écrite dès qu'elle est produite : seule la plus
+        # grande reste en mémoire, jamais le document entier
+        _ecrire_fragments(filename, self._generer_html_rapport_global())
         
         print(f"✓ Rapport HTML généré : {filename}")
     
     def _generer_html_rapport_global(self):
-        """Génère le contenu HTML pour le rapport global"""
-        from io import BytesIO
-        import base64
-        
+        """Fragments HTML du rapport global, produits section par section"""
         stats = self.stats_globales
         
-        # Template HTML de base
-        html = f"""
+        # Fragments du document, écrits au fur et à mesure par generer_rapport_html
+        yield f"""
 <!DOCTYPE html>
 <html lang="fr">
 <head>
@@ -256,7 +1154,7 @@ class GreenmoveAnalytics:
             border-radius: 10px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
         }}
-        .chart-container img {{
+        .chart-container img, .chart-container svg {{
             max-width: 100%;
             height: auto;
             border-radius: 5px;
@@ -349,20 +1247,20 @@ class GreenmoveAnalytics:
                 </tr>
                 <tr>
                     <td>Intensité carbone globale</td>
-                    <td><strong>{(stats['emission_totale']*1000)/stats['distance_totale']:.1f} g CO₂/km</strong></td>
+                    <td><strong>{stats['intensite_globale']:.1f} g CO₂/km</strong></td>
                 </tr>
             </table>
         </div>
 """
         
         # Ajouter les graphiques
-        html += self._generer_graphiques_html()
+        yield self._generer_graphiques_html()
         
         # Analyse par mode de transport
-        html += self._generer_analyse_modes_html()
+        yield self._generer_analyse_modes_html()
         
         # Footer
-        html += f"""
+        yield f"""
         <div class="footer">
             <p>Rapport généré le {datetime.now().strftime('%d/%m/%Y à %H:%M:%S')}</p>
             <p>Greenmove Analytics - Analyse de Mobilité</p>
@@ -371,111 +1269,82 @@ class GreenmoveAnalytics:
 </body>
 </html>
 """
-        return html
     
     def _generer_graphiques_html(self):
-        """Génère les graphiques en base64 pour HTML"""
-        from io import BytesIO
-        import base64
-        
-        html = '<div class="section"><h2>📈 Visualisations</h2>'
+        """Génère les graphiques SVG pour HTML"""
+        agg_modes = self._agregats_par_mode()
+        parties = ['<div class="section"><h2>📈 Visualisations</h2>']
         
         # Graphique 1: Répartition modale
-        fig, ax = plt.subplots(figsize=(10, 6))
-        mode_counts = self.df['mode_transport'].value_counts()
-        colors = plt.cm.Set3(range(len(mode_counts)))
-        ax.pie(mode_counts.values, labels=mode_counts.index, autopct='%1.1f%%',
+        # Une seule figure (même format) vidée entre les trois graphiques
+        fig = Figure(figsize=(10, 6), layout='constrained')
+        ax = fig.subplots()
+        mode_counts = agg_modes[('utilisateur', 'count')].sort_values(ascending=False)
+        colors = colormaps['Set3'](range(len(mode_counts)))
+        ax.pie(mode_counts.to_numpy(), labels=mode_counts.index.to_numpy(), autopct='%1.1f%%',
               colors=colors, startangle=90)
         ax.set_title('Répartition des Trajets par Mode de Transport', fontsize=14, fontweight='bold')
         
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
-        
-        html += f'<div class="chart-container"><img src="data:image/png;base64,{image_base64}" /></div>'
+        parties.append(f'<div class="chart-container">{_figure_svg(fig)}</div>')
         
         # Graphique 2: Distance par mode
-        fig, ax = plt.subplots(figsize=(10, 6))
-        distance_par_mode = self.df.groupby('mode_transport')['distance'].sum().sort_values(ascending=False)
-        distance_par_mode.plot(kind='bar', ax=ax, color='steelblue')
+        fig.clear()
+        ax = fig.subplots()
+        distance_par_mode = agg_modes[('distance', 'sum')].sort_values(ascending=False)
+        _barres(ax, distance_par_mode, color='steelblue')
         ax.set_ylabel('Distance (km)', fontsize=12)
         ax.set_title('Distance Totale par Mode de Transport', fontsize=14, fontweight='bold')
         ax.tick_params(axis='x', rotation=45)
         ax.grid(axis='y', alpha=0.3)
         
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
-        
-        html += f'<div class="chart-container"><img src="data:image/png;base64,{image_base64}" /></div>'
+        parties.append(f'<div class="chart-container">{_figure_svg(fig)}</div>')
         
         # Graphique 3: Émissions CO2 par mode
-        fig, ax = plt.subplots(figsize=(10, 6))
-        co2_par_mode = self.df.groupby('mode_transport')['emission_co2'].sum().sort_values(ascending=False)
-        co2_par_mode.plot(kind='bar', ax=ax, color='coral')
+        fig.clear()
+        ax = fig.subplots()
+        co2_par_mode = agg_modes[('emission_co2', 'sum')].sort_values(ascending=False)
+        _barres(ax, co2_par_mode, color='coral')
         ax.set_ylabel('Émissions CO₂ (g)', fontsize=12)
         ax.set_title('Émissions CO₂ Totales par Mode de Transport', fontsize=14, fontweight='bold')
         ax.tick_params(axis='x', rotation=45)
         ax.grid(axis='y', alpha=0.3)
         
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
-        
-        html += f'<div class="chart-container"><img src="data:image/png;base64,{image_base64}" /></div>'
+        parties.append(f'<div class="chart-container">{_figure_svg(fig)}</div>')
         
-        html += '</div>'
-        return html
+        parties.append('</div>')
+        return ''.join(parties)
     
     def _generer_analyse_modes_html(self):
         """Génère l'analyse par mode en HTML"""
-        html = '<div class="section"><h2>🚗 Analyse par Mode de Transport</h2>'
-        
-        mode_stats = self.df.groupby('mode_transport').agg({
-            'utilisateur': 'count',
-            'distance': ['sum', 'mean'],
-            'duration_in_minutes': 'mean',
-            'emission_co2': ['sum', 'mean']
-        }).round(2)
-        
-        html += '<table><tr><th>Mode</th><th>Trajets</th><th>Distance Totale</th><th>Distance Moy.</th>'
-        html += '<th>Durée Moy.</th><th>CO₂ Total</th><th>CO₂ Moy.</th><th>Intensité</th></tr>'
-        
-        for mode in mode_stats.index:
-            nb = mode_stats.loc[mode, ('utilisateur', 'count')]
-            dist_tot = mode_stats.loc[mode, ('distance', 'sum')]
-            dist_moy = mode_stats.loc[mode, ('distance', 'mean')]
-            duree = mode_stats.loc[mode, ('duration_in_minutes', 'mean')]
-            co2_tot = mode_stats.loc[mode, ('emission_co2', 'sum')]  # en kg
-            co2_moy = mode_stats.loc[mode, ('emission_co2', 'mean')]  # en kg
-            intensite = (co2_tot * 1000) / dist_tot if dist_tot > 0 else 0  # g/km
-            
-            html += f'<tr><td><strong>{mode}</strong></td>'
-            html += f'<td>{nb:.0f}</td>'
-            html += f'<td>{dist_tot:.1f} km</td>'
-            html += f'<td>{dist_moy:.2f} km</td>'
-            html += f'<td>{duree:.1f} min</td>'
-            html += f'<td>{co2_tot:.2f} kg</td>'
-            html += f'<td>{co2_moy*1000:.1f} g</td>'
-            html += f'<td>{intensite:.1f} g/km</td></tr>'
-        
-        html += '</table></div>'
-        return html
+        # Fragments accumulés puis assemblés en une seule chaîne
+        parties = ['<div class="section"><h2>🚗 Analyse par Mode de Transport</h2>',
+                   '<table><tr><th>Mode</th><th>Trajets</th><th>Distance Totale</th><th>Distance Moy.</th>',
+                   '<th>Durée Moy.</th><th>CO₂ Total</th><th>CO₂ Moy.</th><th>Intensité</th></tr>']
+        
+        # Une ligne par mode lue en tuple (pas d'accès .loc cellule par cellule) ;
+        # émissions en kg, intensité en g/km
+        for mode, nb, dist_tot, dist_moy, duree, co2_tot, co2_moy, intensite in self._tableau_modes().itertuples(name=None):
+            parties.append(f'<tr><td><strong>{mode}</strong></td>'
+                           f'<td>{nb:.0f}</td>'
+                           f'<td>{dist_tot:.1f} km</td>'
+                           f'<td>{dist_moy:.2f} km</td>'
+                           f'<td>{duree:.1f} min</td>'
+                           f'<td>{co2_tot:.2f} kg</td>'
+                           f'<td>{co2_moy*1000:.1f} g</td>'
+                           f'<td>{intensite:.1f} g/km</td></tr>')
+        
+        parties.append('</table></div>')
+        return ''.join(parties)
     
     def _page_vue_ensemble(self, pdf):
         """Page 1: Vue d'ensemble"""
-        fig = plt.figure(figsize=(11.69, 8.27))  # A4 landscape
+        agg_modes = self._agregats_par_mode()
+        fig = _figure_page()  # A4 landscape
         fig.suptitle('GREENMOVE - Rapport d\'Analyse des Déplacements', 
                      fontsize=16, fontweight='bold', y=0.98)
         
         # Informations générales
-        ax1 = plt.subplot(3, 2, 1)
+        ax1 = fig.add_subplot(3, 2, 1)
         ax1.axis('off')
         stats = self.stats_globales
         texte_stats = f"""
@@ -502,67 +1371,65 @@ Durée moyenne : {stats['duree_moyenne']:.1f} min
                 bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
         
         # Répartition des modes de transport (camembert)
-        ax2 = plt.subplot(3, 2, 2)
-        mode_counts = self.df['mode_transport'].value_counts()
-        colors = plt.cm.Set3(range(len(mode_counts)))
-        ax2.pie(mode_counts.values, labels=mode_counts.index, autopct='%1.1f%%',
+        ax2 = fig.add_subplot(3, 2, 2)
+        mode_counts = agg_modes[('utilisateur', 'count')].sort_values(ascending=False)
+        colors = colormaps['Set3'](range(len(mode_counts)))
+        ax2.pie(mode_counts.to_numpy(), labels=mode_counts.index.to_numpy(), autopct='%1.1f%%',
                 colors=colors, startangle=90)
         ax2.set_title('Répartition des Trajets par Mode de Transport', fontweight='bold')
         
         # Nombre de trajets par mode (barres horizontales)
-        ax3 = plt.subplot(3, 2, 3)
-        mode_counts.plot(kind='barh', ax=ax3, color='steelblue')
+        ax3 = fig.add_subplot(3, 2, 3)
+        _barres(ax3, mode_counts, horizontal=True, color='steelblue')
         ax3.set_xlabel('Nombre de trajets')
         ax3.set_title('Nombre de Trajets par Mode de Transport', fontweight='bold')
         ax3.grid(axis='x', alpha=0.3)
         
         # Distance totale par mode
-        ax4 = plt.subplot(3, 2, 4)
-        distance_par_mode = self.df.groupby('mode_transport')['distance'].sum().sort_values(ascending=False)
-        distance_par_mode.plot(kind='bar', ax=ax4, color='coral')
+        ax4 = fig.add_subplot(3, 2, 4)
+        distance_par_mode = agg_modes[('distance', 'sum')].sort_values(ascending=False)
+        _barres(ax4, distance_par_mode, color='coral')
         ax4.set_ylabel('Distance (km)')
         ax4.set_title('Distance Totale par Mode de Transport', fontweight='bold')
         ax4.tick_params(axis='x', rotation=45)
         ax4.grid(axis='y', alpha=0.3)
         
         # Émissions CO2 par mode
-        ax5 = plt.subplot(3, 2, 5)
-        co2_par_mode = self.df.groupby('mode_transport')['emission_co2'].sum().sort_values(ascending=False)
-        co2_par_mode.plot(kind='bar', ax=ax5, color='lightcoral')
+        ax5 = fig.add_subplot(3, 2, 5)
+        co2_par_mode = agg_modes[('emission_co2', 'sum')].sort_values(ascending=False)
+        _barres(ax5, co2_par_mode, color='lightcoral')
         ax5.set_ylabel('Émissions CO₂ (g)')
         ax5.set_title('Émissions CO₂ Totales par Mode de Transport', fontweight='bold')
         ax5.tick_params(axis='x', rotation=45)
         ax5.grid(axis='y', alpha=0.3)
         
         # Durée moyenne par mode
-        ax6 = plt.subplot(3, 2, 6)
-        duree_par_mode = self.df.groupby('mode_transport')['duration_in_minutes'].mean().sort_values(ascending=False)
-        duree_par_mode.plot(kind='barh', ax=ax6, color='lightgreen')
+        ax6 = fig.add_subplot(3, 2, 6)
+        duree_par_mode = agg_modes[('duration_in_minutes', 'mean')].sort_values(ascending=False)
+        _barres(ax6, duree_par_mode, horizontal=True, color='lightgreen')
         ax6.set_xlabel('Durée moyenne (minutes)')
         ax6.set_title('Durée Moyenne par Mode de Transport', fontweight='bold')
         ax6.grid(axis='x', alpha=0.3)
         
-        plt.tight_layout()
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
+        pdf.savefig(fig)
     
     def _page_analyse_modes(self, pdf):
         """Page 2: Analyse détaillée par mode de transport"""
-        fig = plt.figure(figsize=(11.69, 8.27))
+        agg_modes = self._agregats_par_mode()
+        fig = _figure_page()
         fig.suptitle('Analyse Détaillée par Mode de Transport', 
                      fontsize=14, fontweight='bold', y=0.98)
         
         # Distance moyenne vs Émissions moyennes
-        ax1 = plt.subplot(2, 2, 1)
-        stats_mode = self.df.groupby('mode_transport').agg({
-            'distance': 'mean',
-            'emission_co2': 'mean'
-        }).round(2)
-        ax1.scatter(stats_mode['distance'], stats_mode['emission_co2'], 
+        ax1 = fig.add_subplot(2, 2, 1)
+        stats_mode = agg_modes[[('distance', 'mean'),
+                                ('emission_co2', 'mean')]].droplevel(1, axis=1).round(2)
+        distances_moy = stats_mode['distance'].to_numpy()
+        emissions_moy = stats_mode['emission_co2'].to_numpy()
+        ax1.scatter(distances_moy, emissions_moy, 
                    s=200, alpha=0.6, c=range(len(stats_mode)), cmap='viridis')
-        for idx, mode in enumerate(stats_mode.index):
-            ax1.annotate(mode, (stats_mode.iloc[idx]['distance'], 
-                               stats_mode.iloc[idx]['emission_co2']),
+        for mode, dist, co2 in zip(stats_mode.index, distances_moy, emissions_moy):
+            ax1.annotate(mode, (dist, co2),
                         fontsize=9, ha='center')
         ax1.set_xlabel('Distance moyenne (km)')
         ax1.set_ylabel('Émissions CO₂ moyennes (g)')
@@ -570,74 +1437,97 @@ Durée moyenne : {stats['duree_moyenne']:.1f} min
         ax1.grid(True, alpha=0.3)
         
         # Intensité carbone (g CO2/km)
-        ax2 = plt.subplot(2, 2, 2)
-        intensite_carbone = ((self.df.groupby('mode_transport')['emission_co2'].sum() * 1000) / 
-                            self.df.groupby('mode_transport')['distance'].sum()).sort_values(ascending=False)
-        intensite_carbone.plot(kind='bar', ax=ax2, color='orangered')
+        ax2 = fig.add_subplot(2, 2, 2)
+        intensite_carbone = self._intensite_par_mode().sort_values(ascending=False)
+        _barres(ax2, intensite_carbone, color='orangered')
         ax2.set_ylabel('g CO₂ / km')
         ax2.set_title('Intensité Carbone par Mode de Transport', fontweight='bold')
         ax2.tick_params(axis='x', rotation=45)
         ax2.grid(axis='y', alpha=0.3)
         
         # Vitesse moyenne par mode (km/h)
-        ax3 = plt.subplot(2, 2, 3)
-        self.df['vitesse_kmh'] = (self.df['distance'] / self.df['duration_in_minutes']) * 60
-        vitesse_par_mode = self.df.groupby('mode_transport')['vitesse_kmh'].mean().sort_values(ascending=False)
-        vitesse_par_mode.plot(kind='barh', ax=ax3, color='skyblue')
+        ax3 = fig.add_subplot(2, 2, 3)
+        vitesse_par_mode = self._vitesse_par_mode().sort_values(ascending=False)
+        _barres(ax3, vitesse_par_mode, horizontal=True, color='skyblue')
         ax3.set_xlabel('Vitesse moyenne (km/h)')
         ax3.set_title('Vitesse Moyenne par Mode de Transport', fontweight='bold')
         ax3.grid(axis='x', alpha=0.3)
         
         # Part modale en distance
-        ax4 = plt.subplot(2, 2, 4)
-        distance_totale_mode = self.df.groupby('mode_transport')['distance'].sum()
-        colors = plt.cm.Pastel1(range(len(distance_totale_mode)))
-        wedges, texts, autotexts = ax4.pie(distance_totale_mode.values, 
-                                            labels=distance_totale_mode.index,
+        ax4 = fig.add_subplot(2, 2, 4)
+        distance_totale_mode = agg_modes[('distance', 'sum')]
+        colors = colormaps['Pastel1'](range(len(distance_totale_mode)))
+        wedges, texts, autotexts = ax4.pie(distance_totale_mode.to_numpy(), 
+                                            labels=distance_totale_mode.index.to_numpy(),
                                             autopct='%1.1f%%',
                                             colors=colors, startangle=90)
         ax4.set_title('Part Modale en Distance', fontweight='bold')
         
-        plt.tight_layout()
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
+        pdf.savefig(fig)
     
     def _page_distribution_distances(self, pdf):
         """Page 3: Distribution des distances"""
-        fig = plt.figure(figsize=(11.69, 8.27))
+        fig = _figure_page()
         fig.suptitle('Distribution des Distances', 
                      fontsize=14, fontweight='bold', y=0.98)
         
+        # Distances renseignées, extraites une fois pour toute la page
+        distances = self.df['distance'].to_numpy()
+        distances = distances[np.isfinite(distances)]
+        # Grille de 1001 quantiles en une seule sélection partielle (sans tri
+        # complet) : courbe cumulée de la page 4 et médiane (quantile 0,5)
+        probabilites = np.linspace(0, 1, 1001)
+        quantiles = (np.quantile(distances, probabilites) if len(distances)
+                     else np.full(len(probabilites), np.nan))
+        
         # Histogramme global
-        ax1 = plt.subplot(2, 2, 1)
-        self.df['distance'].hist(bins=50, ax=ax1, color='steelblue', edgecolor='black', alpha=0.7)
+        ax1 = fig.add_subplot(2, 2, 1)
+        # Distances déjà finies ; extrêmes = premier et dernier quantiles
+        _histogramme(ax1, distances, 50,
+                     etendue=(quantiles[0], quantiles[-1]) if len(distances) else None,
+                     color='steelblue', edgecolor='black', alpha=0.7)
         ax1.set_xlabel('Distance (km)')
         ax1.set_ylabel('Nombre de trajets')
         ax1.set_title('Distribution Globale des Distances', fontweight='bold')
-        ax1.axvline(self.df['distance'].median(), color='red', linestyle='--', 
-                   label=f'Médiane: {self.df["distance"].median():.2f} km')
-        ax1.axvline(self.df['distance'].mean(), color='orange', linestyle='--', 
-                   label=f'Moyenne: {self.df["distance"].mean():.2f} km')
+        mediane = quantiles[500]
+        moyenne = distances.mean(dtype=np.float64)
+        ax1.axvline(mediane, color='red', linestyle='--', label=f'Médiane: {mediane:.2f} km')
+        ax1.axvline(moyenne, color='orange', linestyle='--', label=f'Moyenne: {moyenne:.2f} km')
         ax1.legend()
         ax1.grid(axis='y', alpha=0.3)
         
-        # Boîtes à moustaches par mode
-        ax2 = plt.subplot(2, 2, 2)
-        self.df.boxplot(column='distance', by='mode_transport', ax=ax2)
+        # Boîtes à moustaches par mode, dessinées par ax.boxplot sur les
+        # distances regroupées par code de mode (DataFrame.boxplot passe par pyplot)
+        ax2 = fig.add_subplot(2, 2, 2)
+        codes = self._codes('mode_transport')
+        valeurs = self.df['distance'].to_numpy()
+        gardes = (codes >= 0) & np.isfinite(valeurs)
+        ordre = np.argsort(codes[gardes], kind='stable')
+        presents, debuts = np.unique(codes[gardes][ordre], return_index=True)
+        if len(presents):
+            ax2.boxplot(np.split(valeurs[gardes][ordre], debuts[1:]))
+            ax2.set_xticks(np.arange(1, len(presents) + 1))
+            ax2.set_xticklabels(self.df['mode_transport'].cat.categories[presents])
         ax2.set_xlabel('Mode de transport')
         ax2.set_ylabel('Distance (km)')
         ax2.set_title('Distribution des Distances par Mode', fontweight='bold')
-        plt.suptitle('')  # Enlever le titre automatique
+        # Valeurs aberrantes : un marqueur par trajet, rastérisées pour que
+        # la taille du PDF ne croisse pas avec le nombre de trajets
+        for ligne in ax2.lines:
+            ligne.set_rasterized(True)
         ax2.tick_params(axis='x', rotation=45)
         ax2.grid(axis='y', alpha=0.3)
         
         # Distribution par catégories de distance
-        ax3 = plt.subplot(2, 2, 3)
-        bins_distance = [0, 1, 5, 10, 20, 50, 100, float('inf')]
+        ax3 = fig.add_subplot(2, 2, 3)
+        bornes_distance = np.array([1, 5, 10, 20, 50, 100])
         labels_distance = ['<1km', '1-5km', '5-10km', '10-20km', '20-50km', '50-100km', '>100km']
-        self.df['categorie_distance'] = pd.cut(self.df['distance'], bins=bins_distance, labels=labels_distance)
-        cat_counts = self.df['categorie_distance'].value_counts().sort_index()
-        cat_counts.plot(kind='bar', ax=ax3, color='mediumseagreen')
+        # Classes ]a, b] comme pd.cut sur [0, 1, ..., 100, inf] : recherche côté gauche
+        # parmi les bornes intérieures, puis comptage direct des numéros de classe
+        codes = np.searchsorted(bornes_distance, distances[distances > 0], side='left')
+        cat_counts = pd.Series(np.bincount(codes, minlength=len(labels_distance)),
+                               index=labels_distance)
+        _barres(ax3, cat_counts, color='mediumseagreen')
         ax3.set_xlabel('Catégorie de distance')
         ax3.set_ylabel('Nombre de trajets')
         ax3.set_title('Répartition par Catégorie de Distance', fontweight='bold')
@@ -645,10 +1535,9 @@ Durée moyenne : {stats['duree_moyenne']:.1f} min
         ax3.grid(axis='y', alpha=0.3)
         
         # Cumulative distribution
-        ax4 = plt.subplot(2, 2, 4)
-        distances_sorted = np.sort(self.df['distance'].dropna())
-        cumulative = np.arange(1, len(distances_sorted) + 1) / len(distances_sorted) * 100
-        ax4.plot(distances_sorted, cumulative, linewidth=2, color='darkblue')
+        ax4 = fig.add_subplot(2, 2, 4)
+        # Quantiles calculés plus haut : 1001 points, fidèles aussi aux queues de distribution
+        ax4.plot(quantiles, probabilites * 100, linewidth=2, color='darkblue')
         ax4.set_xlabel('Distance (km)')
         ax4.set_ylabel('Pourcentage cumulé (%)')
         ax4.set_title('Distribution Cumulative des Distances', fontweight='bold')
@@ -657,34 +1546,37 @@ Durée moyenne : {stats['duree_moyenne']:.1f} min
         ax4.axhline(90, color='orange', linestyle='--', alpha=0.5, label='90%')
         ax4.legend()
         
-        plt.tight_layout()
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
+        pdf.savefig(fig, dpi=DPI_RASTER_PDF)
     
     def _page_analyse_temporelle(self, pdf):
         """Page 4: Analyse temporelle"""
-        fig = plt.figure(figsize=(11.69, 8.27))
+        fig = _figure_page()
         fig.suptitle('Analyse Temporelle des Déplacements', 
                      fontsize=14, fontweight='bold', y=0.98)
         
+        jours, jour_semaine, heure = self._composantes_horaires()
+        
         # Trajets par jour
-        ax1 = plt.subplot(3, 1, 1)
-        self.df['date'] = self.df['start_time'].dt.date
-        trajets_par_jour = self.df.groupby('date').size()
-        trajets_par_jour.plot(ax=ax1, color='steelblue', linewidth=1.5)
+        ax1 = fig.add_subplot(3, 1, 1)
+        # Comptage par numéro de jour (np.bincount, linéaire) au lieu du tri de np.unique ;
+        # comme un groupby, seuls les jours ayant des trajets sont conservés
+        numeros = jours.view('i8')
+        premier = numeros.min() if len(numeros) else 0
+        comptes = np.bincount(numeros - premier)
+        presents = np.flatnonzero(comptes)
+        dates = (presents + premier).astype('datetime64[D]')
+        # Courbe tracée par ax.plot (Series.plot passe par pyplot)
+        ax1.plot(dates, comptes[presents], color='steelblue', linewidth=1.5)
         ax1.set_xlabel('Date')
         ax1.set_ylabel('Nombre de trajets')
         ax1.set_title('Évolution du Nombre de Trajets par Jour', fontweight='bold')
         ax1.grid(True, alpha=0.3)
         
         # Trajets par jour de la semaine
-        ax2 = plt.subplot(3, 2, 3)
-        self.df['jour_semaine'] = self.df['start_time'].dt.day_name()
-        jours_ordre = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        ax2 = fig.add_subplot(3, 2, 3)
         jours_fr = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
-        trajets_par_jour_sem = self.df['jour_semaine'].value_counts().reindex(jours_ordre)
-        trajets_par_jour_sem.index = jours_fr
-        trajets_par_jour_sem.plot(kind='bar', ax=ax2, color='coral')
+        trajets_par_jour_sem = pd.Series(np.bincount(jour_semaine, minlength=7), index=jours_fr)
+        _barres(ax2, trajets_par_jour_sem, color='coral')
         ax2.set_xlabel('Jour de la semaine')
         ax2.set_ylabel('Nombre de trajets')
         ax2.set_title('Trajets par Jour de la Semaine', fontweight='bold')
@@ -692,48 +1584,49 @@ Durée moyenne : {stats['duree_moyenne']:.1f} min
         ax2.grid(axis='y', alpha=0.3)
         
         # Trajets par heure
-        ax3 = plt.subplot(3, 2, 4)
-        self.df['heure'] = self.df['start_time'].dt.hour
-        trajets_par_heure = self.df['heure'].value_counts().sort_index()
-        trajets_par_heure.plot(kind='bar', ax=ax3, color='lightgreen')
+        ax3 = fig.add_subplot(3, 2, 4)
+        trajets_par_heure = pd.Series(np.bincount(heure, minlength=24))
+        trajets_par_heure = trajets_par_heure[trajets_par_heure > 0]
+        _barres(ax3, trajets_par_heure, color='lightgreen')
         ax3.set_xlabel('Heure de la journée')
         ax3.set_ylabel('Nombre de trajets')
         ax3.set_title('Trajets par Heure de la Journée', fontweight='bold')
         ax3.grid(axis='y', alpha=0.3)
         
         # Heatmap jour/heure
-        ax4 = plt.subplot(3, 2, (5, 6))
-        heatmap_data = self.df.groupby(['jour_semaine', 'heure']).size().unstack(fill_value=0)
-        heatmap_data = heatmap_data.reindex(jours_ordre)
-        heatmap_data.index = jours_fr
-        sns.heatmap(heatmap_data, cmap='YlOrRd', ax=ax4, cbar_kws={'label': 'Nombre de trajets'})
+        ax4 = fig.add_subplot(3, 2, (5, 6))
+        # Accumulateur 7 × 24 en un seul passage : bincount sur l'indice aplati
+        # (jour * 24 + heure), équivalent à np.add.at(matrice, (jour, heure), 1) en plus rapide
+        comptes_jour_heure = np.bincount(jour_semaine * 24 + heure, minlength=7 * 24).reshape(7, 24)
+        # Seules les heures ayant des trajets, sélectionnées sur la matrice (sans DataFrame)
+        heures = trajets_par_heure.index.to_numpy()
+        # Image 7 × N directement avec imshow (sans les artistes par cellule d'une heatmap seaborn)
+        _carte_chaleur(ax4, comptes_jour_heure[:, heures], heures, jours_fr, 'Nombre de trajets')
         ax4.set_xlabel('Heure de la journée')
         ax4.set_ylabel('Jour de la semaine')
         ax4.set_title('Heatmap: Trajets par Jour et Heure', fontweight='bold')
         
-        plt.tight_layout()
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
+        pdf.savefig(fig)
     
     def _page_emissions_co2(self, pdf):
         """Page 5: Analyse des émissions CO2"""
-        fig = plt.figure(figsize=(11.69, 8.27))
+        agg_modes = self._agregats_par_mode()
+        fig = _figure_page()
         fig.suptitle('Analyse des Émissions CO₂', 
                      fontsize=14, fontweight='bold', y=0.98)
         
         # Émissions par mode (camembert)
-        ax1 = plt.subplot(2, 2, 1)
-        co2_par_mode = self.df.groupby('mode_transport')['emission_co2'].sum()
-        colors = plt.cm.RdYlGn_r(np.linspace(0.2, 0.8, len(co2_par_mode)))
-        ax1.pie(co2_par_mode.values, labels=co2_par_mode.index, 
+        ax1 = fig.add_subplot(2, 2, 1)
+        co2_par_mode = agg_modes[('emission_co2', 'sum')]
+        colors = colormaps['RdYlGn_r'](np.linspace(0.2, 0.8, len(co2_par_mode)))
+        ax1.pie(co2_par_mode.to_numpy(), labels=co2_par_mode.index.to_numpy(), 
                autopct='%1.1f%%', colors=colors, startangle=90)
         ax1.set_title('Répartition des Émissions CO₂ par Mode', fontweight='bold')
         
         # Émissions cumulées dans le temps
-        ax2 = plt.subplot(2, 2, 2)
-        self.df_sorted = self.df.sort_values('start_time')
-        self.df_sorted['co2_cumule'] = self.df_sorted['emission_co2'].cumsum()  # déjà en kg
-        ax2.plot(self.df_sorted['start_time'], self.df_sorted['co2_cumule'], 
+        ax2 = fig.add_subplot(2, 2, 2)
+        co2_cumule = self._co2_cumule_journalier()
+        ax2.plot(co2_cumule.index, co2_cumule.values, 
                 color='darkred', linewidth=2)
         ax2.set_xlabel('Date')
         ax2.set_ylabel('CO₂ cumulé (kg)')
@@ -741,28 +1634,28 @@ Durée moyenne : {stats['duree_moyenne']:.1f} min
         ax2.grid(True, alpha=0.3)
         
         # Distribution des émissions par trajet
-        ax3 = plt.subplot(2, 2, 3)
-        self.df['emission_co2'].hist(bins=50, ax=ax3, color='indianred', edgecolor='black', alpha=0.7)
+        ax3 = fig.add_subplot(2, 2, 3)
+        _histogramme(ax3, self.df['emission_co2'].to_numpy(), 50,
+                     color='indianred', edgecolor='black', alpha=0.7)
         ax3.set_xlabel('Émissions CO₂ par trajet (g)')
         ax3.set_ylabel('Nombre de trajets')
         ax3.set_title('Distribution des Émissions par Trajet', fontweight='bold')
         ax3.grid(axis='y', alpha=0.3)
         
         # Comparaison intensité carbone
-        ax4 = plt.subplot(2, 2, 4)
-        intensite = (self.df.groupby('mode_transport')['emission_co2'].sum() / 
-                    self.df.groupby('mode_transport')['distance'].sum()).sort_values()
-        colors_intensity = ['green' if x < 50 else 'orange' if x < 150 else 'red' for x in intensite.values]
-        intensite.plot(kind='barh', ax=ax4, color=colors_intensity)
+        ax4 = fig.add_subplot(2, 2, 4)
+        intensite = self._intensite_par_mode().sort_values()
+        _barres(ax4, intensite, horizontal=True, color=_couleurs_intensite(intensite))
         ax4.set_xlabel('g CO₂ / km')
         ax4.set_title('Intensité Carbone par Mode\n(vert: faible, orange: moyen, rouge: élevé)', 
                      fontweight='bold')
         ax4.grid(axis='x', alpha=0.3)
         
         # Texte d'analyse
-        emission_totale_kg = self.df['emission_co2'].sum()  # déjà en kg
-        distance_totale = self.df['distance'].sum()
-        intensite_globale = (self.df['emission_co2'].sum() * 1000 / distance_totale) if distance_totale > 0 else 0  # g/km
+        stats = self.stats_globales
+        emission_totale_kg = stats['emission_totale']  # déjà en kg
+        distance_totale = stats['distance_totale']
+        intensite_globale = stats['intensite_globale']  # g/km
         
         texte_analyse = f"""
 BILAN CARBONE
@@ -781,131 +1674,130 @@ Intensité carbone moyenne : {intensite_globale:.1f} g CO₂/km
                 bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8),
                 fontfamily='monospace')
         
-        plt.tight_layout()
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
+        pdf.savefig(fig)
     
     def _page_top_utilisateurs(self, pdf):
         """Page 6: Top utilisateurs"""
-        fig = plt.figure(figsize=(11.69, 8.27))
+        fig = _figure_page()
         fig.suptitle('Analyse des Utilisateurs', 
                      fontsize=14, fontweight='bold', y=0.98)
         
+        agg_users = self._agregats_par_utilisateur()
+        
         # Top 10 utilisateurs par nombre de trajets
-        ax1 = plt.subplot(2, 2, 1)
-        top_trajets = self.df['utilisateur'].value_counts().head(10)
-        top_trajets.plot(kind='barh', ax=ax1, color='steelblue')
+        ax1 = fig.add_subplot(2, 2, 1)
+        top_trajets = _plus_grands(agg_users['trajets'], 10)
+        _barres(ax1, top_trajets, horizontal=True, color='steelblue')
         ax1.set_xlabel('Nombre de trajets')
         ax1.set_title('Top 10 - Utilisateurs les Plus Actifs', fontweight='bold')
         ax1.grid(axis='x', alpha=0.3)
         
         # Top 10 utilisateurs par distance
-        ax2 = plt.subplot(2, 2, 2)
-        top_distance = self.df.groupby('utilisateur')['distance'].sum().sort_values(ascending=False).head(10)
-        top_distance.plot(kind='barh', ax=ax2, color='coral')
+        ax2 = fig.add_subplot(2, 2, 2)
+        top_distance = _plus_grands(agg_users['distance'], 10)
+        _barres(ax2, top_distance, horizontal=True, color='coral')
         ax2.set_xlabel('Distance totale (km)')
         ax2.set_title('Top 10 - Plus Grandes Distances', fontweight='bold')
         ax2.grid(axis='x', alpha=0.3)
         
         # Top 10 utilisateurs par émissions
-        ax3 = plt.subplot(2, 2, 3)
-        top_co2 = self.df.groupby('utilisateur')['emission_co2'].sum().sort_values(ascending=False).head(10)
+        ax3 = fig.add_subplot(2, 2, 3)
+        top_co2 = _plus_grands(agg_users['emission_co2'], 10)
         # Valeurs déjà en kg
-        top_co2.plot(kind='barh', ax=ax3, color='indianred')
+        _barres(ax3, top_co2, horizontal=True, color='indianred')
         ax3.set_xlabel('Émissions CO₂ totales (kg)')
         ax3.set_title('Top 10 - Plus Grandes Émissions CO₂', fontweight='bold')
         ax3.grid(axis='x', alpha=0.3)
         
         # Distribution du nombre de trajets par utilisateur
-        ax4 = plt.subplot(2, 2, 4)
-        trajets_par_user = self.df['utilisateur'].value_counts()
-        trajets_par_user.hist(bins=30, ax=ax4, color='lightgreen', edgecolor='black', alpha=0.7)
+        ax4 = fig.add_subplot(2, 2, 4)
+        trajets_par_user = agg_users['trajets']
+        _histogramme(ax4, trajets_par_user.to_numpy(), 30,
+                     color='lightgreen', edgecolor='black', alpha=0.7)
         ax4.set_xlabel('Nombre de trajets par utilisateur')
         ax4.set_ylabel('Nombre d\'utilisateurs')
         ax4.set_title('Distribution de l\'Activité des Utilisateurs', fontweight='bold')
         ax4.grid(axis='y', alpha=0.3)
-        ax4.axvline(trajets_par_user.median(), color='red', linestyle='--', 
-                   label=f'Médiane: {trajets_par_user.median():.0f}')
+        mediane_trajets = trajets_par_user.median()
+        ax4.axvline(mediane_trajets, color='red', linestyle='--', 
+                   label=f'Médiane: {mediane_trajets:.0f}')
         ax4.legend()
         
-        plt.tight_layout()
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
+        pdf.savefig(fig)
     
-    def generer_rapport_utilisateur(self, utilisateur, filename=None):
-        """Génère un rapport individuel pour un utilisateur"""
+    def generer_rapport_utilisateur(self, utilisateur, filename=None, df_user=None):
+        """Génère un rapport individuel pour un utilisateur
+        
+        df_user permet de fournir des trajets déjà extraits et d'éviter
+        un nouveau parcours de self.df.
+        """
         if filename is None:
             filename = f'rapport_utilisateur_{utilisateur}.pdf'
         
-        df_user = self.df[self.df['utilisateur'] == utilisateur]
+        if df_user is None:
+            df_user = self._trajets_utilisateur(utilisateur)
+        _rendre_rapport_utilisateur(utilisateur, df_user, filename)
+        _fermer_figure_page()
+    
+    def _trajets_utilisateur(self, utilisateur):
+        """Trajets d'un utilisateur, extraits via un index calculé une fois par chargement
         
-        if len(df_user) == 0:
-            print(f"✗ Aucune donnée pour l'utilisateur {utilisateur}")
+        L'index est construit sur les codes catégoriels : positions des lignes
+        triées par code (tri stable, ordre des départs conservé) et bornes de
+        chaque code (np.bincount cumulé). Chaque extraction lit ensuite une
+        tranche contiguë de positions, sans dictionnaire d'un tableau par utilisateur.
+        """
+        utilisateurs = self.df['utilisateur'].cat.categories
+        if self.positions_utilisateurs is None:
+            codes = self._codes('utilisateur')
+            nombres = np.bincount(codes[codes >= 0], minlength=len(utilisateurs))
+            # Lignes sans utilisateur (code -1) triées en tête, jamais extraites
+            bornes = np.concatenate(([0], np.cumsum(nombres))) + (len(codes) - nombres.sum())
+            self.positions_utilisateurs = (np.argsort(codes, kind='stable'), bornes)
+        positions, bornes = self.positions_utilisateurs
+        code = utilisateurs.get_indexer([utilisateur])[0]
+        if code < 0:
+            return self.df.iloc[:0]
+        return self.df.take(positions[bornes[code]:bornes[code + 1]])
+    
+    def generer_rapports_utilisateurs(self, utilisateurs, max_workers=None):
+        """Génère les rapports individuels en parallèle (un processus par rapport)
+        
+        Chaque processus ne reçoit que les trajets de son utilisateur.
+        Générateur : renvoie chaque utilisateur dès que son rapport est écrit,
+        dans l'ordre de fin de rendu. Avec un seul processus utile (un
+        utilisateur ou un seul cœur), les rapports sont rendus ici même, à la
+        suite, sur la même figure de page : ni lancement de processus ni
+        réinitialisation de matplotlib.
+        """
+        utilisateurs = list(utilisateurs)
+        if not utilisateurs:
             return
         
-        with PdfPages(filename) as pdf:
-            fig = plt.figure(figsize=(11.69, 8.27))
-            fig.suptitle(f'Rapport Personnel - Utilisateur: {utilisateur}', 
-                        fontsize=14, fontweight='bold', y=0.98)
-            
-            # Statistiques personnelles
-            ax1 = plt.subplot(3, 2, 1)
-            ax1.axis('off')
-            stats_user = f"""
-STATISTIQUES PERSONNELLES
-
-Nombre de trajets : {len(df_user)}
-Distance totale : {df_user['distance'].sum():.1f} km
-Distance moyenne : {df_user['distance'].mean():.2f} km
-
-Durée totale : {df_user['duration_in_minutes'].sum():.0f} min
-Durée moyenne : {df_user['duration_in_minutes'].mean():.1f} min
-
-Émissions CO₂ totales : {df_user['emission_co2'].sum()*1000:.0f} g ({df_user['emission_co2'].sum():.2f} kg)
-Émissions moyennes : {df_user['emission_co2'].mean()*1000:.1f} g/trajet
-
-Mode préféré : {df_user['mode_transport'].mode()[0]}
-            """
-            ax1.text(0.05, 0.95, stats_user, transform=ax1.transAxes,
-                    fontsize=10, verticalalignment='top', fontfamily='monospace',
-                    bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
-            
-            # Modes de transport utilisés
-            ax2 = plt.subplot(3, 2, 2)
-            df_user['mode_transport'].value_counts().plot(kind='pie', ax=ax2, autopct='%1.1f%%')
-            ax2.set_title('Vos Modes de Transport', fontweight='bold')
-            ax2.set_ylabel('')
-            
-            # Distance par mode
-            ax3 = plt.subplot(3, 2, 3)
-            df_user.groupby('mode_transport')['distance'].sum().plot(kind='bar', ax=ax3, color='steelblue')
-            ax3.set_ylabel('Distance (km)')
-            ax3.set_title('Distance par Mode de Transport', fontweight='bold')
-            ax3.tick_params(axis='x', rotation=45)
-            ax3.grid(axis='y', alpha=0.3)
-            
-            # Émissions par mode
-            ax4 = plt.subplot(3, 2, 4)
-            df_user.groupby('mode_transport')['emission_co2'].sum().plot(kind='bar', ax=ax4, color='coral')
-            ax4.set_ylabel('Émissions CO₂ (g)')
-            ax4.set_title('Émissions CO₂ par Mode', fontweight='bold')
-            ax4.tick_params(axis='x', rotation=45)
-            ax4.grid(axis='y', alpha=0.3)
-            
-            # Évolution temporelle
-            ax5 = plt.subplot(3, 1, 3)
-            df_user_sorted = df_user.sort_values('start_time')
-            df_user_sorted.set_index('start_time')['distance'].plot(ax=ax5, marker='o', linestyle='-', markersize=3)
-            ax5.set_xlabel('Date')
-            ax5.set_ylabel('Distance (km)')
-            ax5.set_title('Évolution de Vos Trajets', fontweight='bold')
-            ax5.grid(True, alpha=0.3)
-            
-            plt.tight_layout()
-            pdf.savefig(fig, bbox_inches='tight')
-            plt.close()
+        max_workers = max_workers or min(len(utilisateurs), os.cpu_count() or 1)
+        
+        if max_workers == 1:
+            try:
+                for u in utilisateurs:
+                    _rendre_rapport_utilisateur(u, self._trajets_utilisateur(u),
+                                                f'rapport_utilisateur_{u}.pdf')
+                    yield u
+            finally:
+                _fermer_figure_page()
+            return
         
-        print(f"✓ Rapport utilisateur généré : {filename}")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # Soumission au fil de l'eau : le découpage de l'utilisateur suivant
+            # se fait pendant que les premiers rapports sont déjà en rendu
+            futures = {}
+            for u in utilisateurs:
+                df_user = self._trajets_utilisateur(u)
+                future = executor.submit(_rendre_rapport_utilisateur, u, df_user,
+                                         f'rapport_utilisateur_{u}.pdf')
+                futures[future] = u
+            for future in as_completed(futures):
+                future.result()
+                yield futures[future]
     
     def generer_analyse_pdf(self, filename='analyse_greenmove.pdf', format='pdf'):
         """Génère une analyse en format PDF ou HTML avec illustrations et texte"""
@@ -913,35 +1805,37 @@ Mode préféré : {df_user['mode_transport'].mode()[0]}
             filename = filename.replace('.pdf', '.html')
             return self.generer_analyse_html(filename)
         
-        with PdfPages(filename) as pdf:
-            # Page 1: Résumé Exécutif avec KPIs
-            self._page_analyse_resume_executif(pdf)
-            
-            # Page 2: Analyse Détaillée des Modes de Transport
-            self._page_analyse_modes_detaillee(pdf)
-            
-            # Page 3: Impact Environnemental et Recommandations
-            self._page_analyse_environnement(pdf)
-            
-            # Page 4: Analyse Comportementale des Utilisateurs
-            self._page_analyse_comportementale(pdf)
-            
-            # Métadonnées
-            d = pdf.infodict()
-            d['Title'] = 'Greenmove - Analyse Détaillée'
-            d['Author'] = 'Greenmove Analytics'
-            d['Subject'] = 'Analyse et Recommandations'
-            d['CreationDate'] = datetime.now()
+        from matplotlib.backends.backend_pdf import PdfPages
+        
+        # Figure de page fermée même si un rendu échoue
+        try:
+            with PdfPages(filename) as pdf:
+                # Page 1: Résumé Exécutif avec KPIs
+                self._page_analyse_resume_executif(pdf)
+                
+                # Page 2: Analyse Détaillée des Modes de Transport
+                self._page_analyse_modes_detaillee(pdf)
+                
+                # Page 3: Impact Environnemental et Recommandations
+                self._page_analyse_environnement(pdf)
+                
+                # Page 4: Analyse Comportementale des Utilisateurs
+                self._page_analyse_comportementale(pdf)
+                
+                # Métadonnées
+                d = pdf.infodict()
+                d['Title'] = 'Greenmove - Analyse Détaillée'
+                d['Author'] = 'Greenmove Analytics'
+                d['Subject'] = 'Analyse et Recommandations'
+                d['CreationDate'] = datetime.now()
+        finally:
+            _fermer_figure_page()
         
         print(f"✓ Analyse PDF générée : {filename}")
     
     def generer_analyse_html(self, filename='analyse_greenmove.html'):
         """Génère l'analyse en format HTML avec illustrations"""
-        import base64
-        from io import BytesIO
-        
-        stats = self.stats_globales
-        intensite_globale = (stats['emission_totale'] * 1000) / stats['distance_totale']  # g/km
+        intensite_globale = self.stats_globales['intensite_globale']  # g/km
         
         # Déterminer le niveau (seuils configurables dans config.py)
         if intensite_globale < SEUIL_EXCELLENT:
@@ -957,7 +1851,17 @@ Mode préféré : {df_user['mode_transport'].mode()[0]}
             niveau = "À AMÉLIORER ❗"
             couleur = '#dc3545'
         
-        html = f"""
+        # Sections écrites dès qu'elles sont produites (voir _ecrire_fragments)
+        _ecrire_fragments(filename, self._generer_html_analyse(niveau, couleur))
+        
+        print(f"✓ Analyse HTML générée : {filename}")
+    
+    def _generer_html_analyse(self, niveau, couleur):
+        """Fragments HTML de l'analyse stratégique, produits section par section"""
+        stats = self.stats_globales
+        intensite_globale = stats['intensite_globale']  # g/km
+        
+        yield f"""
 <!DOCTYPE html>
 <html lang="fr">
 <head>
@@ -1078,7 +1982,7 @@ Mode préféré : {df_user['mode_transport'].mode()[0]}
             border-radius: 10px;
             box-shadow: 0 4px 15px rgba(0,0,0,0.1);
         }}
-        .chart-container img {{
+        .chart-container img, .chart-container svg {{
             max-width: 100%;
             height: auto;
             border-radius: 8px;
@@ -1214,19 +2118,19 @@ Mode préféré : {df_user['mode_transport'].mode()[0]}
 """
         
         # Ajouter les graphiques d'analyse
-        html += self._generer_graphiques_analyse_html()
+        yield self._generer_graphiques_analyse_html()
         
         # Analyse des modes
-        html += self._generer_tableau_modes_analyse_html()
+        yield self._generer_tableau_modes_analyse_html()
         
         # Plan d'action
-        html += self._generer_plan_action_html()
+        yield self._generer_plan_action_html()
         
         # Segmentation utilisateurs
-        html += self._generer_segmentation_html()
+        yield self._generer_segmentation_html()
         
         # Footer
-        html += f"""
+        yield f"""
         <div class="footer">
             <p style="font-size: 1.1em; margin-bottom: 10px;">
                 <strong>Période analysée :</strong> {stats['periode_debut'].strftime('%d/%m/%Y')} - {stats['periode_fin'].strftime('%d/%m/%Y')}
@@ -1238,92 +2142,63 @@ Mode préféré : {df_user['mode_transport'].mode()[0]}
 </body>
 </html>
 """
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html)
-        
-        print(f"✓ Analyse HTML générée : {filename}")
     
     def _generer_graphiques_analyse_html(self):
         """Génère les graphiques pour l'analyse HTML"""
-        from io import BytesIO
-        import base64
+        agg_modes = self._agregats_par_mode()
         
-        html = '<div class="section"><h2>📊 Visualisations Détaillées</h2>'
+        parties = ['<div class="section"><h2>📊 Visualisations Détaillées</h2>']
         
         # Graphique: Intensité carbone par mode
-        fig, ax = plt.subplots(figsize=(12, 6))
-        intensite_carbone = ((self.df.groupby('mode_transport')['emission_co2'].sum() * 1000) / 
-                            self.df.groupby('mode_transport')['distance'].sum()).sort_values()
-        colors_intensity = ['#28a745' if x < 50 else '#ffc107' if x < 150 else '#dc3545' 
-                           for x in intensite_carbone.values]
-        intensite_carbone.plot(kind='barh', ax=ax, color=colors_intensity)
+        fig = Figure(figsize=(12, 6), layout='constrained')
+        ax = fig.subplots()
+        intensite_carbone = self._intensite_par_mode().sort_values()
+        colors_intensity = _couleurs_intensite(intensite_carbone, ('#28a745', '#ffc107', '#dc3545'))
+        _barres(ax, intensite_carbone, horizontal=True, color=colors_intensity)
         ax.set_xlabel('g CO₂ / km', fontsize=12)
         ax.set_title('Intensité Carbone par Mode de Transport', fontsize=14, fontweight='bold')
         ax.grid(axis='x', alpha=0.3)
         
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
-        
-        html += f'<div class="chart-container"><img src="data:image/png;base64,{image_base64}" /></div>'
+        parties.append(f'<div class="chart-container">{_figure_svg(fig)}</div>')
         
-        # Graphique: Répartition des émissions (donut)
-        fig, ax = plt.subplots(figsize=(10, 8))
-        co2_par_mode = self.df.groupby('mode_transport')['emission_co2'].sum()
-        colors = plt.cm.RdYlGn_r(np.linspace(0.2, 0.8, len(co2_par_mode)))
-        wedges, texts, autotexts = ax.pie(co2_par_mode.values, labels=co2_par_mode.index,
+        # Graphique: Répartition des émissions (donut), sur la même figure redimensionnée
+        fig.clear()
+        fig.set_size_inches(10, 8)
+        ax = fig.subplots()
+        co2_par_mode = agg_modes[('emission_co2', 'sum')]
+        colors = colormaps['RdYlGn_r'](np.linspace(0.2, 0.8, len(co2_par_mode)))
+        wedges, texts, autotexts = ax.pie(co2_par_mode.to_numpy(), labels=co2_par_mode.index.to_numpy(),
                                             autopct='%1.1f%%', colors=colors, startangle=90,
                                             pctdistance=0.85)
-        centre_circle = plt.Circle((0, 0), 0.70, fc='white')
+        centre_circle = Circle((0, 0), 0.70, fc='white')
         ax.add_artist(centre_circle)
         ax.set_title('Répartition des Émissions CO₂ par Mode', fontsize=14, fontweight='bold')
         
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
+        parties.append(f'<div class="chart-container">{_figure_svg(fig)}</div></div>')
         
-        html += f'<div class="chart-container"><img src="data:image/png;base64,{image_base64}" /></div></div>'
-        
-        return html
+        return ''.join(parties)
     
     def _generer_tableau_modes_analyse_html(self):
         """Génère le tableau d'analyse des modes pour HTML"""
-        mode_stats = self.df.groupby('mode_transport').agg({
-            'utilisateur': 'count',
-            'distance': ['sum', 'mean'],
-            'duration_in_minutes': 'mean',
-            'emission_co2': ['sum', 'mean']
-        }).round(2)
-        
-        html = '<div class="section"><h2>🚗 Analyse Détaillée par Mode de Transport</h2>'
-        html += '<table><tr><th>Mode</th><th>Trajets</th><th>Distance Tot.</th><th>Distance Moy.</th>'
-        html += '<th>Durée Moy.</th><th>CO₂ Total</th><th>CO₂ Moy.</th><th>Intensité (g/km)</th></tr>'
-        
-        for mode in mode_stats.index:
-            nb = mode_stats.loc[mode, ('utilisateur', 'count')]
-            dist_tot = mode_stats.loc[mode, ('distance', 'sum')]
-            dist_moy = mode_stats.loc[mode, ('distance', 'mean')]
-            duree = mode_stats.loc[mode, ('duration_in_minutes', 'mean')]
-            co2_tot = mode_stats.loc[mode, ('emission_co2', 'sum')]  # en kg
-            co2_moy = mode_stats.loc[mode, ('emission_co2', 'mean')]  # en kg
-            intensite = (co2_tot * 1000) / dist_tot if dist_tot > 0 else 0  # g/km
-            
-            html += f'<tr><td><strong>{mode.upper()}</strong></td>'
-            html += f'<td>{nb:.0f}</td>'
-            html += f'<td>{dist_tot:,.1f} km</td>'
-            html += f'<td>{dist_moy:.2f} km</td>'
-            html += f'<td>{duree:.1f} min</td>'
-            html += f'<td>{co2_tot:.2f} kg</td>'
-            html += f'<td>{co2_moy*1000:.1f} g</td>'
-            html += f'<td><strong>{intensite:.1f}</strong></td></tr>'
-        
-        html += '</table></div>'
-        return html
+        # Fragments accumulés puis assemblés en une seule chaîne
+        parties = ['<div class="section"><h2>🚗 Analyse Détaillée par Mode de Transport</h2>',
+                   '<table><tr><th>Mode</th><th>Trajets</th><th>Distance Tot.</th><th>Distance Moy.</th>',
+                   '<th>Durée Moy.</th><th>CO₂ Total</th><th>CO₂ Moy.</th><th>Intensité (g/km)</th></tr>']
+        
+        # Une ligne par mode lue en tuple (pas d'accès .loc cellule par cellule) ;
+        # émissions en kg, intensité en g/km
+        for mode, nb, dist_tot, dist_moy, duree, co2_tot, co2_moy, intensite in self._tableau_modes().itertuples(name=None):
+            parties.append(f'<tr><td><strong>{mode.upper()}</strong></td>'
+                           f'<td>{nb:.0f}</td>'
+                           f'<td>{dist_tot:,.1f} km</td>'
+                           f'<td>{dist_moy:.2f} km</td>'
+                           f'<td>{duree:.1f} min</td>'
+                           f'<td>{co2_tot:.2f} kg</td>'
+                           f'<td>{co2_moy*1000:.1f} g</td>'
+                           f'<td><strong>{intensite:.1f}</strong></td></tr>')
+        
+        parties.append('</table></div>')
+        return ''.join(parties)
     
     def _generer_plan_action_html(self):
         """Génère le plan d'action pour HTML"""
@@ -1365,41 +2240,37 @@ Mode préféré : {df_user['mode_transport'].mode()[0]}
     
     def _generer_segmentation_html(self):
         """Génère la segmentation utilisateurs pour HTML"""
-        trajets_par_user = self.df.groupby('utilisateur').size()
-        
-        segments = {
-            'Très actifs (>50 trajets)': len(trajets_par_user[trajets_par_user > 50]),
-            'Actifs (20-50)': len(trajets_par_user[(trajets_par_user >= 20) & (trajets_par_user <= 50)]),
-            'Moyens (10-19)': len(trajets_par_user[(trajets_par_user >= 10) & (trajets_par_user < 20)]),
-            'Occasionnels (<10)': len(trajets_par_user[trajets_par_user < 10])
-        }
+        # Les segments couvrent tous les utilisateurs : leur somme sert de total
+        segments = self._segments_utilisateurs()
+        nombre_utilisateurs = sum(segments.values())
         
-        html = '<div class="section"><h2>👥 Segmentation des Utilisateurs</h2>'
+        parties = ['<div class="section"><h2>👥 Segmentation des Utilisateurs</h2>']
         
         for segment, count in segments.items():
-            pct = (count / len(trajets_par_user)) * 100
-            html += f'''
+            pct = (count / nombre_utilisateurs) * 100
+            parties.append(f'''
             <div class="segment-card">
                 <h4>{segment}</h4>
                 <p style="font-size: 1.3em; margin: 10px 0;">
                     <strong>{count}</strong> utilisateurs (<strong>{pct:.1f}%</strong>)
                 </p>
             </div>
-            '''
+            ''')
         
-        html += '</div>'
-        return html
+        parties.append('</div>')
+        return ''.join(parties)
     
     def _page_analyse_resume_executif(self, pdf):
         """Page 1: Résumé exécutif avec KPIs principaux"""
-        fig = plt.figure(figsize=(11.69, 8.27))
+        agg_modes = self._agregats_par_mode()
+        fig = _figure_page()
         fig.suptitle('ANALYSE GREENMOVE - Résumé Exécutif', 
                      fontsize=16, fontweight='bold', y=0.98)
         
         stats = self.stats_globales
         
         # Encadré principal avec statistiques clés
-        ax1 = plt.subplot(2, 3, (1, 2))
+        ax1 = fig.add_subplot(2, 3, (1, 2))
         ax1.axis('off')
         
         texte_principal = f"""
@@ -1414,7 +2285,7 @@ PÉRIODE ANALYSÉE
 UTILISATEURS ET ACTIVITÉ
   👥 Utilisateurs actifs : {stats['nombre_utilisateurs']:,}
   🚶 Trajets enregistrés : {stats['nombre_trajets']:,}
-  📊 Moyenne par utilisateur : {stats['nombre_trajets']/stats['nombre_utilisateurs']:.1f} trajets
+  📊 Moyenne par utilisateur : {stats['trajets_par_utilisateur']:.1f} trajets
 
 DISTANCES PARCOURUES
   🛣️  Distance totale : {stats['distance_totale']:,.1f} km
@@ -1437,44 +2308,40 @@ IMPACT ENVIRONNEMENTAL
                 bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.3))
         
         # Graphique de répartition modale
-        ax2 = plt.subplot(2, 3, 3)
-        mode_counts = self.df['mode_transport'].value_counts()
-        colors = plt.cm.Set3(range(len(mode_counts)))
-        wedges, texts, autotexts = ax2.pie(mode_counts.values, labels=mode_counts.index, 
+        ax2 = fig.add_subplot(2, 3, 3)
+        mode_counts = agg_modes[('utilisateur', 'count')].sort_values(ascending=False)
+        colors = colormaps['Set3'](range(len(mode_counts)))
+        wedges, texts, autotexts = ax2.pie(mode_counts.to_numpy(), labels=mode_counts.index.to_numpy(), 
                                             autopct='%1.1f%%', colors=colors, startangle=90)
         ax2.set_title('Répartition Modale\n(nombre de trajets)', fontweight='bold', fontsize=11)
         
         # Top 3 modes les plus utilisés
-        ax3 = plt.subplot(2, 3, 4)
+        ax3 = fig.add_subplot(2, 3, 4)
         ax3.axis('off')
         top_modes = mode_counts.head(3)
-        texte_top = "╔═══════════════════════════════╗\n"
-        texte_top += "║   TOP 3 MODES DE TRANSPORT   ║\n"
-        texte_top += "╚═══════════════════════════════╝\n\n"
+        lignes = [ENTETE_TOP_MODES]
         for i, (mode, count) in enumerate(top_modes.items(), 1):
             pct = (count / stats['nombre_trajets']) * 100
-            texte_top += f"{i}. {mode.upper()}\n"
-            texte_top += f"   {count:,} trajets ({pct:.1f}%)\n\n"
+            lignes.append(f"{i}. {mode.upper()}\n"
+                          f"   {count:,} trajets ({pct:.1f}%)\n\n")
+        texte_top = ''.join(lignes)
         
         ax3.text(0.1, 0.9, texte_top, transform=ax3.transAxes,
                 fontsize=10, verticalalignment='top', fontfamily='monospace',
                 bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.5))
         
         # Graphique d'intensité carbone
-        ax4 = plt.subplot(2, 3, 5)
-        intensite_carbone = ((self.df.groupby('mode_transport')['emission_co2'].sum() * 1000) / 
-                            self.df.groupby('mode_transport')['distance'].sum()).sort_values()
-        colors_intensity = ['green' if x < 50 else 'orange' if x < 150 else 'red' 
-                           for x in intensite_carbone.values]
-        intensite_carbone.plot(kind='barh', ax=ax4, color=colors_intensity)
+        ax4 = fig.add_subplot(2, 3, 5)
+        intensite_carbone = self._intensite_par_mode().sort_values()
+        _barres(ax4, intensite_carbone, horizontal=True, color=_couleurs_intensite(intensite_carbone))
         ax4.set_xlabel('g CO₂ / km', fontsize=9)
         ax4.set_title('Intensité Carbone\npar Mode', fontweight='bold', fontsize=11)
         ax4.grid(axis='x', alpha=0.3)
         
         # Indicateur synthétique
-        ax5 = plt.subplot(2, 3, 6)
+        ax5 = fig.add_subplot(2, 3, 6)
         ax5.axis('off')
-        intensite_globale = (stats['emission_totale'] * 1000) / stats['distance_totale']  # g/km
+        intensite_globale = stats['intensite_globale']  # g/km
         
         # Déterminer le niveau
         if intensite_globale < 80:
@@ -1512,54 +2379,41 @@ Objectif recommandé :
                 fontsize=10, verticalalignment='top', fontfamily='monospace',
                 bbox=dict(boxstyle='round', facecolor=couleur, alpha=0.4))
         
-        plt.tight_layout()
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
+        pdf.savefig(fig)
     
     def _page_analyse_modes_detaillee(self, pdf):
         """Page 2: Analyse détaillée des modes de transport"""
-        fig = plt.figure(figsize=(11.69, 8.27))
+        agg_modes = self._agregats_par_mode()
+        fig = _figure_page()
         fig.suptitle('ANALYSE DÉTAILLÉE PAR MODE DE TRANSPORT', 
                      fontsize=14, fontweight='bold', y=0.98)
         
         # Tableau récapitulatif des modes
-        ax1 = plt.subplot(3, 2, (1, 2))
+        ax1 = fig.add_subplot(3, 2, (1, 2))
         ax1.axis('off')
         
-        mode_stats = self.df.groupby('mode_transport').agg({
-            'utilisateur': 'count',
-            'distance': ['sum', 'mean'],
-            'duration_in_minutes': 'mean',
-            'emission_co2': ['sum', 'mean']
-        }).round(2)
-        
-        texte_analyse = "╔════════════════════════════════════════════════════════════════════════════╗\n"
-        texte_analyse += "║                    ANALYSE COMPARATIVE DES MODES                           ║\n"
-        texte_analyse += "╚════════════════════════════════════════════════════════════════════════════╝\n\n"
-        
-        for mode in mode_stats.index:
-            nb_trajets = mode_stats.loc[mode, ('utilisateur', 'count')]
-            dist_totale = mode_stats.loc[mode, ('distance', 'sum')]
-            dist_moy = mode_stats.loc[mode, ('distance', 'mean')]
-            duree_moy = mode_stats.loc[mode, ('duration_in_minutes', 'mean')]
-            co2_total = mode_stats.loc[mode, ('emission_co2', 'sum')]  # en kg
-            co2_moy = mode_stats.loc[mode, ('emission_co2', 'mean')]  # en kg
-            intensite = (co2_total * 1000) / dist_totale if dist_totale > 0 else 0  # g/km
-            
-            texte_analyse += f"━━━ {mode.upper()} ━━━\n"
-            texte_analyse += f"  Trajets : {nb_trajets:.0f} | Distance : {dist_totale:.1f} km | CO₂ : {co2_total:.2f} kg\n"
-            texte_analyse += f"  Moy/trajet : {dist_moy:.2f} km en {duree_moy:.1f} min | {co2_moy*1000:.1f} g CO₂\n"
-            texte_analyse += f"  Intensité : {intensite:.1f} g CO₂/km\n\n"
+        mode_stats = self._tableau_modes()
+        
+        lignes = [ENTETE_ANALYSE_MODES]
+        
+        # Un bloc par mode lu en tuple, même gabarit que l'analyse textuelle ;
+        # émissions totales en kg, moyenne par trajet en g, intensité en g/km
+        for (mode, nb, dist_tot, dist_moy, duree_moy,
+             co2_tot, co2_moy, intensite) in mode_stats.itertuples(name=None):
+            lignes.append(MODELE_MODE_PAGE.format(
+                mode=mode.upper(), nb=nb, dist_tot=dist_tot, dist_moy=dist_moy,
+                duree_moy=duree_moy, co2_tot=co2_tot, co2_moy=co2_moy * 1000,
+                intensite=intensite))
+        texte_analyse = ''.join(lignes)
         
         ax1.text(0.02, 0.98, texte_analyse, transform=ax1.transAxes,
                 fontsize=8, verticalalignment='top', fontfamily='monospace',
                 bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
         
         # Graphique comparatif : Distance vs CO2
-        ax2 = plt.subplot(3, 2, 3)
-        for mode in mode_stats.index:
-            dist = mode_stats.loc[mode, ('distance', 'sum')]
-            co2 = mode_stats.loc[mode, ('emission_co2', 'sum')]  # déjà en kg
+        ax2 = fig.add_subplot(3, 2, 3)
+        for mode, dist, co2 in zip(mode_stats.index, mode_stats[('distance', 'sum')].to_numpy(),
+                                   mode_stats[('emission_co2', 'sum')].to_numpy()):  # CO₂ déjà en kg
             ax2.scatter(dist, co2, s=300, alpha=0.6, label=mode)
             ax2.annotate(mode, (dist, co2), fontsize=8, ha='center')
         
@@ -1569,24 +2423,23 @@ Objectif recommandé :
         ax2.grid(True, alpha=0.3)
         
         # Part modale en distance
-        ax3 = plt.subplot(3, 2, 4)
-        distance_par_mode = self.df.groupby('mode_transport')['distance'].sum().sort_values(ascending=False)
-        distance_par_mode.plot(kind='bar', ax=ax3, color='steelblue')
+        ax3 = fig.add_subplot(3, 2, 4)
+        distance_par_mode = agg_modes[('distance', 'sum')].sort_values(ascending=False)
+        _barres(ax3, distance_par_mode, color='steelblue')
         ax3.set_ylabel('Distance (km)', fontsize=9)
         ax3.set_title('Distance Totale par Mode', fontweight='bold')
         ax3.tick_params(axis='x', rotation=45)
         ax3.grid(axis='y', alpha=0.3)
         
         # Efficacité énergétique (vitesse vs émissions)
-        ax4 = plt.subplot(3, 2, 5)
-        self.df['vitesse_kmh'] = (self.df['distance'] / self.df['duration_in_minutes']) * 60
-        vitesse_par_mode = self.df.groupby('mode_transport')['vitesse_kmh'].mean()
-        co2_par_km = (self.df.groupby('mode_transport')['emission_co2'].sum() / 
-                      self.df.groupby('mode_transport')['distance'].sum())
-        
-        for mode in vitesse_par_mode.index:
-            ax4.scatter(vitesse_par_mode[mode], co2_par_km[mode], s=200, alpha=0.6)
-            ax4.annotate(mode, (vitesse_par_mode[mode], co2_par_km[mode]), 
+        ax4 = fig.add_subplot(3, 2, 5)
+        vitesse_par_mode = self._vitesse_par_mode()
+        # Intensité mémorisée (g CO₂/km) plutôt qu'une nouvelle division des agrégats
+        co2_par_km = self._intensite_par_mode().reindex(vitesse_par_mode.index)
+        for mode, vitesse, co2 in zip(vitesse_par_mode.index, vitesse_par_mode.to_numpy(),
+                                      co2_par_km.to_numpy()):
+            ax4.scatter(vitesse, co2, s=200, alpha=0.6)
+            ax4.annotate(mode, (vitesse, co2), 
                         fontsize=8, ha='center')
         
         ax4.set_xlabel('Vitesse moyenne (km/h)', fontsize=9)
@@ -1595,51 +2448,48 @@ Objectif recommandé :
         ax4.grid(True, alpha=0.3)
         
         # Recommandations par mode
-        ax5 = plt.subplot(3, 2, 6)
+        ax5 = fig.add_subplot(3, 2, 6)
         ax5.axis('off')
         
-        texte_reco = "╔═══════════════════════════════╗\n"
-        texte_reco += "║      RECOMMANDATIONS          ║\n"
-        texte_reco += "╚═══════════════════════════════╝\n\n"
+        lignes = [ENTETE_RECOMMANDATIONS]
         
         # Identifier les opportunités
-        mode_max_co2 = self.df.groupby('mode_transport')['emission_co2'].sum().idxmax()
-        pct_max = (self.df.groupby('mode_transport')['emission_co2'].sum().max() / 
-                  self.stats_globales['emission_totale'] * 100)
+        mode_max_co2, pct_max = self._mode_plus_emetteur()
         
-        texte_reco += f"🎯 PRIORITÉ 1\n"
-        texte_reco += f"Mode '{mode_max_co2}' représente\n"
-        texte_reco += f"{pct_max:.1f}% des émissions.\n"
-        texte_reco += f"→ Cibler ce mode en priorité\n\n"
+        lignes.append(f"🎯 PRIORITÉ 1\n"
+                      f"Mode '{mode_max_co2}' représente\n"
+                      f"{pct_max:.1f}% des émissions.\n"
+                      f"→ Cibler ce mode en priorité\n\n")
         
         # Trajets courts en voiture
-        if 'car' in self.df['mode_transport'].values:
-            trajets_courts = len(self.df[(self.df['mode_transport'] == 'car') & 
-                                         (self.df['distance'] < 5)])
-            if trajets_courts > 0:
-                texte_reco += f"🚗 OPPORTUNITÉ\n"
-                texte_reco += f"{trajets_courts} trajets en voiture\n"
-                texte_reco += f"< 5 km pourraient être\n"
-                texte_reco += f"remplacés par vélo/marche\n\n"
-        
-        # Mode le plus écologique
-        mode_min_co2 = co2_par_km.idxmin()
-        texte_reco += f"🌱 MODE LE PLUS VERT\n"
-        texte_reco += f"'{mode_min_co2}'\n"
-        texte_reco += f"{co2_par_km[mode_min_co2]:.1f} g CO₂/km\n"
-        texte_reco += f"→ À promouvoir activement\n"
+        trajets_courts = self._trajets_courts_voiture()
+        if trajets_courts:
+            lignes.append(f"🚗 OPPORTUNITÉ\n"
+                          f"{trajets_courts} trajets en voiture\n"
+                          f"< 5 km pourraient être\n"
+                          f"remplacés par vélo/marche\n\n")
+        
+        # Mode le plus écologique : position du minimum (NaN ignorés) lue
+        # directement dans le tableau, sans recherche par libellé
+        intensites = co2_par_km.to_numpy()
+        if not np.isnan(intensites).all():
+            i = np.nanargmin(intensites)
+            lignes.append(f"🌱 MODE LE PLUS VERT\n"
+                          f"'{co2_par_km.index[i]}'\n"
+                          f"{intensites[i]:.1f} g CO₂/km\n"
+                          f"→ À promouvoir activement\n")
+        texte_reco = ''.join(lignes)
         
         ax5.text(0.05, 0.95, texte_reco, transform=ax5.transAxes,
                 fontsize=9, verticalalignment='top', fontfamily='monospace',
                 bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.4))
         
-        plt.tight_layout()
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
+        pdf.savefig(fig)
     
     def _page_analyse_environnement(self, pdf):
         """Page 3: Impact environnemental et recommandations"""
-        fig = plt.figure(figsize=(11.69, 8.27))
+        agg_modes = self._agregats_par_mode()
+        fig = _figure_page()
         fig.suptitle('IMPACT ENVIRONNEMENTAL ET RECOMMANDATIONS', 
                      fontsize=14, fontweight='bold', y=0.98)
         
@@ -1647,7 +2497,7 @@ Objectif recommandé :
         emission_totale_kg = stats['emission_totale']  # déjà en kg
         
         # Bilan carbone
-        ax1 = plt.subplot(3, 2, 1)
+        ax1 = fig.add_subplot(3, 2, 1)
         ax1.axis('off')
         
         texte_bilan = f"""
@@ -1660,13 +2510,13 @@ Objectif recommandé :
 ({stats['emission_totale']/1000:.3f} tonnes)
 
 Par utilisateur
-{emission_totale_kg/stats['nombre_utilisateurs']:.2f} kg CO₂
+{stats['emission_par_utilisateur']:.2f} kg CO₂
 
 Par trajet
 {stats['emission_moyenne']*1000:.1f} g CO₂
 
 Intensité moyenne
-{(stats['emission_totale']*1000)/stats['distance_totale']:.1f} g CO₂/km
+{stats['intensite_globale']:.1f} g CO₂/km
         """
         
         ax1.text(0.05, 0.95, texte_bilan, transform=ax1.transAxes,
@@ -1674,7 +2524,7 @@ Intensité moyenne
                 bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.5))
         
         # Équivalences visuelles
-        ax2 = plt.subplot(3, 2, 2)
+        ax2 = fig.add_subplot(3, 2, 2)
         equivalences = {
             'Vols Paris-NY': emission_totale_kg / 2100,
             'Trajets TGV\nParis-Lyon': emission_totale_kg / 0.2,
@@ -1688,12 +2538,11 @@ Intensité moyenne
         ax2.grid(axis='x', alpha=0.3)
         
         # Évolution cumulative des émissions
-        ax3 = plt.subplot(3, 2, 3)
-        df_sorted = self.df.sort_values('start_time')
-        df_sorted['co2_cumule'] = df_sorted['emission_co2'].cumsum()  # déjà en kg
-        ax3.plot(df_sorted['start_time'], df_sorted['co2_cumule'], 
+        ax3 = fig.add_subplot(3, 2, 3)
+        co2_cumule = self._co2_cumule_journalier()
+        ax3.plot(co2_cumule.index, co2_cumule.values, 
                 color='darkred', linewidth=2)
-        ax3.fill_between(df_sorted['start_time'], df_sorted['co2_cumule'], 
+        ax3.fill_between(co2_cumule.index, co2_cumule.values, 
                          alpha=0.3, color='red')
         ax3.set_xlabel('Date', fontsize=9)
         ax3.set_ylabel('CO₂ cumulé (kg)', fontsize=9)
@@ -1701,115 +2550,72 @@ Intensité moyenne
         ax3.grid(True, alpha=0.3)
         
         # Répartition des émissions (donut chart)
-        ax4 = plt.subplot(3, 2, 4)
-        co2_par_mode = self.df.groupby('mode_transport')['emission_co2'].sum()
-        colors = plt.cm.RdYlGn_r(np.linspace(0.2, 0.8, len(co2_par_mode)))
-        wedges, texts, autotexts = ax4.pie(co2_par_mode.values, labels=co2_par_mode.index,
+        ax4 = fig.add_subplot(3, 2, 4)
+        co2_par_mode = agg_modes[('emission_co2', 'sum')]
+        colors = colormaps['RdYlGn_r'](np.linspace(0.2, 0.8, len(co2_par_mode)))
+        wedges, texts, autotexts = ax4.pie(co2_par_mode.to_numpy(), labels=co2_par_mode.index.to_numpy(),
                                             autopct='%1.1f%%', colors=colors, startangle=90,
                                             pctdistance=0.85)
         # Ajouter un cercle au centre pour effet donut
-        centre_circle = plt.Circle((0, 0), 0.70, fc='white')
+        centre_circle = Circle((0, 0), 0.70, fc='white')
         ax4.add_artist(centre_circle)
         ax4.set_title('Répartition des Émissions CO₂', fontweight='bold')
         
         # Plan d'action
-        ax5 = plt.subplot(3, 2, (5, 6))
+        ax5 = fig.add_subplot(3, 2, (5, 6))
         ax5.axis('off')
         
-        texte_plan = """
-╔══════════════════════════════════════════════════════════════════════════════╗
-║                          PLAN D'ACTION RECOMMANDÉ                            ║
-╚══════════════════════════════════════════════════════════════════════════════╝
-
-🎯 OBJECTIFS
-   • Réduire les émissions de 20% sur 6 mois
-   • Augmenter la part des modes doux (vélo, marche) de 15%
-   • Sensibiliser 100% des utilisateurs
-
-📋 ACTIONS PRIORITAIRES
-
-   1. PROMOTION DES MODES DOUX
-      → Campagne de sensibilisation sur les trajets < 5 km
-      → Mise en place d'incitations (gamification, récompenses)
-      → Communication sur les bénéfices santé/environnement
-
-   2. OPTIMISATION DES DÉPLACEMENTS
-      → Encourager le covoiturage pour les trajets en voiture
-      → Développer les transports en commun pour les trajets moyens
-      → Créer des challenges inter-utilisateurs
-
-   3. SUIVI ET MESURE
-      → Dashboard mensuel des émissions par utilisateur
-      → Alertes automatiques si dépassement de seuils
-      → Rapports trimestriels avec comparaison d'objectifs
-
-   4. FORMATION ET ACCOMPAGNEMENT
-      → Guide des bonnes pratiques de mobilité durable
-      → Ateliers de sensibilisation au bilan carbone
-      → Coaching personnalisé pour les plus gros émetteurs
-
-🎖️ INDICATEURS DE SUCCÈS
-   ✓ Réduction de 20% des émissions CO₂
-   ✓ +15% de trajets en modes doux
-   ✓ Satisfaction utilisateurs > 80%
-   ✓ Engagement actif > 70% des utilisateurs
-        """
-        
-        ax5.text(0.02, 0.98, texte_plan, transform=ax5.transAxes,
+        ax5.text(0.02, 0.98, PLAN_ACTION_TEXTE, transform=ax5.transAxes,
                 fontsize=8, verticalalignment='top', fontfamily='monospace',
                 bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.3))
         
-        plt.tight_layout()
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
+        pdf.savefig(fig)
     
     def _page_analyse_comportementale(self, pdf):
         """Page 4: Analyse comportementale des utilisateurs"""
-        fig = plt.figure(figsize=(11.69, 8.27))
+        fig = _figure_page()
         fig.suptitle('ANALYSE COMPORTEMENTALE DES UTILISATEURS', 
                      fontsize=14, fontweight='bold', y=0.98)
         
         # Segmentation des utilisateurs
-        ax1 = plt.subplot(2, 3, 1)
+        ax1 = fig.add_subplot(2, 3, 1)
         ax1.axis('off')
         
-        trajets_par_user = self.df.groupby('utilisateur').size()
+        trajets_par_user = self._agregats_par_utilisateur()['trajets']
         
-        # Créer des segments
-        segments = {
-            'Très actifs (>50 trajets)': len(trajets_par_user[trajets_par_user > 50]),
-            'Actifs (20-50)': len(trajets_par_user[(trajets_par_user >= 20) & (trajets_par_user <= 50)]),
-            'Moyens (10-19)': len(trajets_par_user[(trajets_par_user >= 10) & (trajets_par_user < 20)]),
-            'Occasionnels (<10)': len(trajets_par_user[trajets_par_user < 10])
-        }
+        # Créer des segments (leur somme couvre tous les utilisateurs)
+        segments = self._segments_utilisateurs()
+        nombre_utilisateurs = sum(segments.values())
         
-        texte_segment = "╔═══════════════════════════╗\n"
-        texte_segment += "║  SEGMENTATION UTILISATEURS║\n"
-        texte_segment += "╚═══════════════════════════╝\n\n"
+        lignes = [ENTETE_SEGMENTATION]
         
         for segment, count in segments.items():
-            pct = (count / len(trajets_par_user)) * 100
-            texte_segment += f"{segment}\n"
-            texte_segment += f"{count} users ({pct:.1f}%)\n\n"
+            pct = (count / nombre_utilisateurs) * 100
+            lignes.append(f"{segment}\n"
+                          f"{count} users ({pct:.1f}%)\n\n")
+        texte_segment = ''.join(lignes)
         
         ax1.text(0.05, 0.95, texte_segment, transform=ax1.transAxes,
                 fontsize=9, verticalalignment='top', fontfamily='monospace',
                 bbox=dict(boxstyle='round', facecolor='lavender', alpha=0.5))
         
         # Pie chart des segments
-        ax2 = plt.subplot(2, 3, 2)
+        ax2 = fig.add_subplot(2, 3, 2)
         colors_seg = ['darkgreen', 'lightgreen', 'orange', 'lightcoral']
         ax2.pie(segments.values(), labels=segments.keys(), autopct='%1.1f%%',
                colors=colors_seg, startangle=90)
         ax2.set_title('Répartition des Profils', fontweight='bold', fontsize=10)
         
         # Distribution de l'activité
-        ax3 = plt.subplot(2, 3, 3)
-        trajets_par_user.hist(bins=30, ax=ax3, color='steelblue', edgecolor='black', alpha=0.7)
-        ax3.axvline(trajets_par_user.median(), color='red', linestyle='--', 
-                   label=f'Médiane: {trajets_par_user.median():.0f}')
-        ax3.axvline(trajets_par_user.mean(), color='orange', linestyle='--',
-                   label=f'Moyenne: {trajets_par_user.mean():.0f}')
+        ax3 = fig.add_subplot(2, 3, 3)
+        _histogramme(ax3, trajets_par_user.to_numpy(), 30,
+                     color='steelblue', edgecolor='black', alpha=0.7)
+        mediane_trajets = trajets_par_user.median()
+        moyenne_trajets = trajets_par_user.mean()
+        ax3.axvline(mediane_trajets, color='red', linestyle='--', 
+                   label=f'Médiane: {mediane_trajets:.0f}')
+        ax3.axvline(moyenne_trajets, color='orange', linestyle='--',
+                   label=f'Moyenne: {moyenne_trajets:.0f}')
         ax3.set_xlabel('Nombre de trajets', fontsize=9)
         ax3.set_ylabel('Nombre d\'utilisateurs', fontsize=9)
         ax3.set_title('Distribution de l\'Activité', fontweight='bold', fontsize=10)
@@ -1817,178 +2623,229 @@ Intensité moyenne
         ax3.grid(axis='y', alpha=0.3)
         
         # Top 10 utilisateurs par émissions
-        ax4 = plt.subplot(2, 3, 4)
-        top_co2_users = self.df.groupby('utilisateur')['emission_co2'].sum().sort_values(ascending=False).head(10)
+        ax4 = fig.add_subplot(2, 3, 4)
+        top_co2_users = _plus_grands(self._agregats_par_utilisateur()['emission_co2'], 10)
         # Valeurs déjà en kg
-        top_co2_users.plot(kind='barh', ax=ax4, color='indianred')
+        _barres(ax4, top_co2_users, horizontal=True, color='indianred')
         ax4.set_xlabel('Émissions CO₂ (kg)', fontsize=9)
         ax4.set_title('Top 10 Émetteurs CO₂', fontweight='bold', fontsize=10)
         ax4.grid(axis='x', alpha=0.3)
         
         # Préférences modales par segment
-        ax5 = plt.subplot(2, 3, 5)
-        # Créer une matrice de préférences
-        user_segments = pd.cut(trajets_par_user, bins=[0, 10, 20, 50, float('inf')],
-                               labels=['Occasionnel', 'Moyen', 'Actif', 'Très actif'])
-        
-        df_with_segment = self.df.copy()
-        df_with_segment['segment'] = df_with_segment['utilisateur'].map(
-            dict(zip(trajets_par_user.index, user_segments))
-        )
-        
-        mode_by_segment = pd.crosstab(df_with_segment['segment'], 
-                                       df_with_segment['mode_transport'],
-                                       normalize='index') * 100
-        
-        sns.heatmap(mode_by_segment, annot=True, fmt='.1f', cmap='YlOrRd', ax=ax5,
-                   cbar_kws={'label': '% de trajets'})
+        ax5 = fig.add_subplot(2, 3, 5)
+        # Matrice de préférences segment × mode, sans copier self.df : le segment
+        # de chaque utilisateur (mêmes bornes que la segmentation, voir
+        # _segment_activite) est propagé aux trajets par les codes catégoriels,
+        # puis compté avec np.bincount
+        libelles_segments = ['Occasionnel', 'Moyen', 'Actif', 'Très actif']
+        utilisateurs = self.df['utilisateur'].cat.categories
+        modes = self.df['mode_transport'].cat.categories
+        segment_par_code = np.full(len(utilisateurs), -1)
+        segment_par_code[utilisateurs.get_indexer(trajets_par_user.index)] = _segment_activite(
+            trajets_par_user.to_numpy())
+        
+        codes_utilisateur = self._codes('utilisateur')
+        codes_mode = self._codes('mode_transport')
+        renseignes = (codes_utilisateur >= 0) & (codes_mode >= 0)
+        # Sélection (copie de deux tableaux de codes) seulement s'il manque des valeurs
+        if not renseignes.all():
+            codes_utilisateur = codes_utilisateur[renseignes]
+            codes_mode = codes_mode[renseignes]
+        segment = segment_par_code[codes_utilisateur]
+        comptes = np.bincount(segment * len(modes) + codes_mode,
+                              minlength=len(libelles_segments) * len(modes))
+        comptes = pd.DataFrame(comptes.reshape(len(libelles_segments), len(modes)),
+                               index=pd.Index(libelles_segments, name='segment'), columns=modes)
+        # Comme pd.crosstab(normalize='index') : segments et modes vides écartés
+        comptes = comptes.loc[comptes.sum(axis=1) > 0, comptes.sum(axis=0) > 0]
+        mode_by_segment = comptes.div(comptes.sum(axis=1), axis=0) * 100
+        
+        valeurs = mode_by_segment.to_numpy()
+        image = _carte_chaleur(ax5, valeurs, mode_by_segment.columns, mode_by_segment.index,
+                               '% de trajets')
+        # Valeurs dans les cellules, en blanc sur les couleurs foncées
+        # (normalisation de toute la matrice en un appel, pas cellule par cellule)
+        foncees = np.asarray(image.norm(valeurs)) > 0.6
+        for (i, j), valeur in np.ndenumerate(valeurs):
+            ax5.text(j, i, f'{valeur:.1f}', ha='center', va='center',
+                     color='white' if foncees[i, j] else 'black')
         ax5.set_xlabel('Mode de transport', fontsize=9)
         ax5.set_ylabel('Segment utilisateur', fontsize=9)
         ax5.set_title('Préférences Modales par Segment', fontweight='bold', fontsize=10)
-        plt.setp(ax5.get_xticklabels(), rotation=45, ha='right')
+        setp(ax5.get_xticklabels(), rotation=45, ha='right')
         
         # Insights et recommandations
-        ax6 = plt.subplot(2, 3, 6)
+        ax6 = fig.add_subplot(2, 3, 6)
         ax6.axis('off')
         
-        texte_insights = """
-╔═════════════════════════════╗
-║   INSIGHTS COMPORTEMENTAUX  ║
-╚═════════════════════════════╝
-
-📊 OBSERVATIONS CLÉS
-
-• Distribution inégale
-  de l'activité entre
-  utilisateurs
-
-• Top 20% des utilisateurs
-  génèrent potentiellement
-  60-80% du trafic
+        ax6.text(0.05, 0.95, INSIGHTS_COMPORTEMENTAUX_TEXTE, transform=ax6.transAxes,
+                fontsize=8, verticalalignment='top', fontfamily='monospace',
+                bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.5))
+        
+        pdf.savefig(fig)
+    
+    def generer_analyse_textuelle(self, filename='analyse_greenmove.txt'):
+        """Génère une analyse textuelle détaillée en français"""
+        # En-tête et vue d'ensemble remplis en un seul appel de gabarit
+        stats = self.stats_globales
+        texte = [MODELE_VUE_ENSEMBLE_TEXTE.format(
+            separateur=SEPARATEUR_TEXTE, sous_separateur=SOUS_SEPARATEUR_TEXTE,
+            debut=stats['periode_debut'], fin=stats['periode_fin'],
+            nb_utilisateurs=stats['nombre_utilisateurs'], nb_trajets=stats['nombre_trajets'],
+            dist_tot=stats['distance_totale'], dist_moy=stats['distance_moyenne'],
+            duree_tot=stats['duree_totale'], heures=stats['duree_totale'] / 60,
+            co2_g=stats['emission_totale'] * 1000, co2_kg=stats['emission_totale'])]
+        
+        # Analyse par mode
+        texte.append("\n2. ANALYSE PAR MODE DE TRANSPORT\n")
+        texte.append(SOUS_SEPARATEUR_TEXTE)
+        for mode, nb, dist_tot, dist_moy, duree_moy, co2_tot, co2_moy, intensite in self._tableau_modes().itertuples(name=None):
+            # Un bloc par mode, émissions converties en g
+            texte.append(MODELE_MODE_TEXTE.format(
+                mode=mode.upper(), nb=nb, dist_tot=dist_tot, dist_moy=dist_moy,
+                duree_moy=duree_moy, co2_tot=co2_tot * 1000, co2_moy=co2_moy * 1000,
+                intensite=intensite))
+        
+        # Impact environnemental
+        emission_totale_kg = stats['emission_totale']  # déjà en kg
+        texte.append(MODELE_IMPACT_TEXTE.format(
+            sous_separateur=SOUS_SEPARATEUR_TEXTE, co2_kg=emission_totale_kg,
+            tgv=emission_totale_kg / 0.2, vols=emission_totale_kg / 2100,
+            boeuf=emission_totale_kg / 0.4, arbres=emission_totale_kg * 0.09))
+        
+        # Modes les plus propres
+        intensite_par_mode = self._intensite_par_mode().sort_values()
+        texte.append("Modes les plus écologiques (g CO₂/km) :\n")
+        for i, (mode, val) in enumerate(intensite_par_mode.items(), 1):
+            texte.append(f"  {i}. {mode} : {val:.1f} g CO₂/km\n")
+        
+        # Recommandations
+        texte.append("\n\n4. RECOMMANDATIONS\n")
+        texte.append(SOUS_SEPARATEUR_TEXTE)
+        
+        # Identifier le mode le plus émetteur
+        mode_max_co2, pct_max_co2 = self._mode_plus_emetteur()
+        
+        texte.append(f"• Le mode '{mode_max_co2}' représente {pct_max_co2:.1f}% des émissions totales.\n")
+        texte.append(f"  → Privilégier les alternatives moins polluantes pour ce type de trajet.\n\n")
+        
+        # Analyser les trajets courts en voiture
+        trajets_courts_voiture = self._trajets_courts_voiture()
+        if trajets_courts_voiture:
+            texte.append(f"• {trajets_courts_voiture} trajets en voiture font moins de 5 km.\n")
+            texte.append(f"  → Ces trajets pourraient être effectués en vélo ou à pied.\n\n")
+        
+        texte.append(CONSEILS_REDUCTION_TEXTE)
+        
+        texte.append("\n" + SEPARATEUR_TEXTE)
+        texte.append(f"Rapport généré le {datetime.now():%d/%m/%Y à %H:%M:%S}\n")
+        texte.append(SEPARATEUR_TEXTE)
+        
+        # Texte assemblé en mémoire puis écrit en une fois
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(''.join(texte))
+        
+        print(f"✓ Analyse textuelle générée : {filename}")
 
-• Corrélation entre
-  fréquence d'usage et
-  diversité des modes
 
-💡 ACTIONS CIBLÉES
+def _rendre_rapport_utilisateur(utilisateur, df_user, filename):
+    """Dessine le rapport PDF d'un utilisateur à partir de ses seuls trajets
+    
+    Fonction de module (et non méthode) pour pouvoir être exécutée dans un
+    processus séparé sans transmettre l'instance ni la connexion. La figure
+    de page est conservée d'un rapport à l'autre dans un même processus.
+    """
+    if len(df_user) == 0:
+        print(f"✗ Aucune donnée pour l'utilisateur {utilisateur}")
+        return
+    
+    from matplotlib.backends.backend_pdf import PdfPages
+    
+    with PdfPages(filename) as pdf:
+        fig = _figure_page()
+        fig.suptitle(f'Rapport Personnel - Utilisateur: {utilisateur}', 
+                    fontsize=14, fontweight='bold', y=0.98)
+        
+        # Statistiques personnelles (sommes et moyennes d'un même parcours par métrique)
+        ax1 = fig.add_subplot(3, 2, 1)
+        ax1.axis('off')
+        sommes, nombres = _sommes_et_nombres(df_user)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            moyennes = {col: sommes[col] / nombres[col] for col in COLONNES_NUMERIQUES}
+        # Trajets par mode : comptage sur les codes catégoriels, du plus au moins
+        # utilisé (à égalité, ordre des catégories comme Series.mode)
+        modes = df_user['mode_transport']
+        codes = modes.cat.codes.to_numpy()
+        nombres_par_code = np.bincount(codes[codes >= 0], minlength=len(modes.cat.categories))
+        modes_user = pd.Series(nombres_par_code, index=modes.cat.categories)
+        modes_user = modes_user[modes_user > 0].sort_values(ascending=False, kind='stable')
+        stats_user = f"""
+STATISTIQUES PERSONNELLES
 
-→ Utilisateurs occasionnels:
-  Campagnes de réengagement
+Nombre de trajets : {len(df_user)}
+Distance totale : {sommes['distance']:.1f} km
+Distance moyenne : {moyennes['distance']:.2f} km
 
-→ Utilisateurs moyens:
-  Encourager régularité
+Durée totale : {sommes['duration_in_minutes']:.0f} min
+Durée moyenne : {moyennes['duration_in_minutes']:.1f} min
 
-→ Utilisateurs actifs:
-  Gamification avancée
-  Ambassadeurs green
+Émissions CO₂ totales : {sommes['emission_co2']*1000:.0f} g ({sommes['emission_co2']:.2f} kg)
+Émissions moyennes : {moyennes['emission_co2']*1000:.1f} g/trajet
 
-→ Très actifs:
-  Programme VIP
-  Challenges personnalisés
+Mode préféré : {modes_user.index[0] if len(modes_user) else '-'}
         """
+        ax1.text(0.05, 0.95, stats_user, transform=ax1.transAxes,
+                fontsize=10, verticalalignment='top', fontfamily='monospace',
+                bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
+        
+        # Modes de transport utilisés
+        ax2 = fig.add_subplot(3, 2, 2)
+        ax2.pie(modes_user.to_numpy(), labels=modes_user.index.to_numpy(), autopct='%1.1f%%')
+        ax2.set_title('Vos Modes de Transport', fontweight='bold')
+        ax2.set_ylabel('')
+        
+        # Distance et émissions par mode : accumulées sur les codes déjà extraits
+        # pour le comptage (sans nouveau groupby), modes présents dans l'ordre des catégories
+        presents = nombres_par_code > 0
+        par_mode_user = pd.DataFrame(
+            {col: _sommes_par_code(codes, df_user[col].to_numpy(), len(nombres_par_code),
+                                   nombres_par_code)[0][presents]
+             for col in ('distance', 'emission_co2')},
+            index=modes.cat.categories[presents].rename('mode_transport')
+        )
         
-        ax6.text(0.05, 0.95, texte_insights, transform=ax6.transAxes,
-                fontsize=8, verticalalignment='top', fontfamily='monospace',
-                bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.5))
+        # Distance par mode
+        ax3 = fig.add_subplot(3, 2, 3)
+        _barres(ax3, par_mode_user['distance'], color='steelblue')
+        ax3.set_ylabel('Distance (km)')
+        ax3.set_title('Distance par Mode de Transport', fontweight='bold')
+        ax3.tick_params(axis='x', rotation=45)
+        ax3.grid(axis='y', alpha=0.3)
         
-        plt.tight_layout()
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
-    
-    def generer_analyse_textuelle(self, filename='analyse_greenmove.txt'):
-        """Génère une analyse textuelle détaillée en français"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("GREENMOVE - RAPPORT D'ANALYSE DES DÉPLACEMENTS\n")
-            f.write("=" * 80 + "\n\n")
-            
-            # Vue d'ensemble
-            f.write("1. VUE D'ENSEMBLE\n")
-            f.write("-" * 80 + "\n")
-            stats = self.stats_globales
-            f.write(f"Période d'analyse : du {stats['periode_debut'].strftime('%d/%m/%Y')} ")
-            f.write(f"au {stats['periode_fin'].strftime('%d/%m/%Y')}\n\n")
-            f.write(f"• Nombre d'utilisateurs actifs : {stats['nombre_utilisateurs']:,}\n")
-            f.write(f"• Nombre total de trajets : {stats['nombre_trajets']:,}\n")
-            f.write(f"• Distance totale parcourue : {stats['distance_totale']:,.1f} km\n")
-            f.write(f"• Distance moyenne par trajet : {stats['distance_moyenne']:.2f} km\n")
-            f.write(f"• Durée totale : {stats['duree_totale']:,.0f} minutes ")
-            f.write(f"({stats['duree_totale']/60:.0f} heures)\n")
-            f.write(f"• Émissions CO₂ totales : {stats['emission_totale']*1000:,.0f} g ")
-            f.write(f"({stats['emission_totale']:.1f} kg)\n\n")
-            
-            # Analyse par mode
-            f.write("\n2. ANALYSE PAR MODE DE TRANSPORT\n")
-            f.write("-" * 80 + "\n")
-            mode_stats = self.df.groupby('mode_transport').agg({
-                'utilisateur': 'count',
-                'distance': ['sum', 'mean'],
-                'duration_in_minutes': 'mean',
-                'emission_co2': ['sum', 'mean']
-            }).round(2)
-            
-            for mode in mode_stats.index:
-                f.write(f"\n{mode.upper()}\n")
-                f.write(f"  • Nombre de trajets : {mode_stats.loc[mode, ('utilisateur', 'count')]:.0f}\n")
-                f.write(f"  • Distance totale : {mode_stats.loc[mode, ('distance', 'sum')]:.1f} km\n")
-                f.write(f"  • Distance moyenne : {mode_stats.loc[mode, ('distance', 'mean')]:.2f} km\n")
-                f.write(f"  • Durée moyenne : {mode_stats.loc[mode, ('duration_in_minutes', 'mean')]:.1f} min\n")
-                f.write(f"  • Émissions totales : {mode_stats.loc[mode, ('emission_co2', 'sum')]*1000:.0f} g\n")
-                f.write(f"  • Émissions moyennes : {mode_stats.loc[mode, ('emission_co2', 'mean')]*1000:.1f} g\n")
-                
-                # Calcul intensité carbone
-                intensite = (mode_stats.loc[mode, ('emission_co2', 'sum')] * 1000) / mode_stats.loc[mode, ('distance', 'sum')]
-                f.write(f"  • Intensité carbone : {intensite:.1f} g CO₂/km\n")
-            
-            # Impact environnemental
-            f.write("\n\n3. IMPACT ENVIRONNEMENTAL\n")
-            f.write("-" * 80 + "\n")
-            emission_totale_kg = stats['emission_totale']  # déjà en kg
-            f.write(f"Les trajets enregistrés ont généré {emission_totale_kg:.1f} kg de CO₂.\n\n")
-            f.write("Équivalences :\n")
-            f.write(f"  • {emission_totale_kg/0.2:.0f} trajets Paris-Lyon en TGV\n")
-            f.write(f"  • {emission_totale_kg/2100:.2f} vols aller-retour Paris-New York\n")
-            f.write(f"  • {emission_totale_kg/0.4:.0f} kg de viande de bœuf produite\n")
-            f.write(f"  • {emission_totale_kg*0.09:.0f} arbres nécessaires pour compenser (sur 1 an)\n\n")
-            
-            # Modes les plus propres
-            intensite_par_mode = ((self.df.groupby('mode_transport')['emission_co2'].sum() * 1000) / 
-                                 self.df.groupby('mode_transport')['distance'].sum()).sort_values()
-            f.write("Modes les plus écologiques (g CO₂/km) :\n")
-            for i, (mode, val) in enumerate(intensite_par_mode.items(), 1):
-                f.write(f"  {i}. {mode} : {val:.1f} g CO₂/km\n")
-            
-            # Recommandations
-            f.write("\n\n4. RECOMMANDATIONS\n")
-            f.write("-" * 80 + "\n")
-            
-            # Identifier le mode le plus émetteur
-            mode_max_co2 = self.df.groupby('mode_transport')['emission_co2'].sum().idxmax()
-            pct_max_co2 = (self.df.groupby('mode_transport')['emission_co2'].sum().max() / 
-                          stats['emission_totale'] * 100)
-            
-            f.write(f"• Le mode '{mode_max_co2}' représente {pct_max_co2:.1f}% des émissions totales.\n")
-            f.write(f"  → Privilégier les alternatives moins polluantes pour ce type de trajet.\n\n")
-            
-            # Analyser les trajets courts en voiture
-            if 'car' in self.df['mode_transport'].values:
-                trajets_courts_voiture = len(self.df[(self.df['mode_transport'] == 'car') & 
-                                                     (self.df['distance'] < 5)])
-                if trajets_courts_voiture > 0:
-                    f.write(f"• {trajets_courts_voiture} trajets en voiture font moins de 5 km.\n")
-                    f.write(f"  → Ces trajets pourraient être effectués en vélo ou à pied.\n\n")
-            
-            f.write("• Pour réduire l'empreinte carbone :\n")
-            f.write("  - Privilégier les transports en commun pour les trajets urbains\n")
-            f.write("  - Utiliser le vélo pour les trajets de moins de 5 km\n")
-            f.write("  - Covoiturer pour les trajets en voiture\n")
-            f.write("  - Regrouper les déplacements pour optimiser les trajets\n")
-            
-            f.write("\n" + "=" * 80 + "\n")
-            f.write("Rapport généré le " + datetime.now().strftime('%d/%m/%Y à %H:%M:%S') + "\n")
-            f.write("=" * 80 + "\n")
+        # Émissions par mode
+        ax4 = fig.add_subplot(3, 2, 4)
+        _barres(ax4, par_mode_user['emission_co2'], color='coral')
+        ax4.set_ylabel('Émissions CO₂ (g)')
+        ax4.set_title('Émissions CO₂ par Mode', fontweight='bold')
+        ax4.tick_params(axis='x', rotation=45)
+        ax4.grid(axis='y', alpha=0.3)
         
-        print(f"✓ Analyse textuelle générée : {filename}")
+        # Évolution temporelle
+        ax5 = fig.add_subplot(3, 1, 3)
+        # Deux tableaux réordonnés (tri stable, quasi gratuit : trajets déjà lus
+        # par date de départ) au lieu d'une copie triée puis réindexée du DataFrame
+        departs = df_user['start_time'].to_numpy()
+        ordre = np.argsort(departs, kind='stable')
+        ax5.plot(departs[ordre], df_user['distance'].to_numpy()[ordre],
+                 marker='o', linestyle='-', markersize=3)
+        ax5.set_xlabel('Date')
+        ax5.set_ylabel('Distance (km)')
+        ax5.set_title('Évolution de Vos Trajets', fontweight='bold')
+        ax5.grid(True, alpha=0.3)
+        
+        pdf.savefig(fig)
+    
+    print(f"✓ Rapport utilisateur généré : {filename}")
 
 
 def main():
@@ -2068,9 +2925,9 @@ def main():
     
     # Générer des rapports individuels pour les 5 utilisateurs les plus actifs
     print("👤 Génération des rapports utilisateurs...")
-    top_users = analytics.df['utilisateur'].value_counts().head(5).index
-    for user in top_users:
-        analytics.generer_rapport_utilisateur(user)
+    top_users = analytics.top_utilisateurs(5)
+    # Rapports indépendants : rendus en parallèle, un processus par utilisateur
+    list(analytics.generer_rapports_utilisateurs(top_users))
     
     print()
     print("=" * 60)